@@ -12,9 +12,10 @@ Example of use: python b2sum.py file.txt
 
 import sys
 import argparse
-from hashlib import blake2b
 from pathlib import Path
 
+from hashsum import check_manifests, hash_file, ordered_map
+
 def calculate_b2sum(file_path, hash_length=None):
     """
     Calculate BLAKE2b hash sum of a file.
@@ -27,17 +28,8 @@ def calculate_b2sum(file_path, hash_length=None):
         tuple: (hash_hex_string, error_message)
     """
     try:
-        # Create BLAKE2b hash object with specified digest size
-        if hash_length:
-            hasher = blake2b(digest_size=hash_length)
-        else:
-            hasher = blake2b()
-        
-        # Read and update hash in chunks for memory efficiency
-        with open(file_path, 'rb') as file:
-            while chunk := file.read(8192):  # 8KB chunks
-                hasher.update(chunk)
-                
+        # BLAKE2b with the requested digest size (64 bytes by default)
+        hasher = hash_file(file_path, 'blake2b', hash_length)
         return hasher.hexdigest(), None
         
     except Exception as e:
@@ -61,65 +53,93 @@ def main():
         default=None
     )
     parser.add_argument(
-        '--check',
+        '-c', '--check',
         action='store_true',
         help='Read checksums from files and check them'
     )
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Do not print OK for verified files'
+    )
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help='Print nothing when checking; the exit status shows success'
+    )
+    parser.add_argument(
+        '-w', '--warn',
+        action='store_true',
+        help='Warn about improperly formatted checksum lines'
+    )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Fail on improperly formatted checksum lines'
+    )
+    parser.add_argument(
+        '--ignore-missing',
+        action='store_true',
+        help='Do not fail or report for missing files'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Hash N files at a time'
+    )
 
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
 
     # Check mode
     if args.check:
-        check_files(args.files)
+        if not check_files(args.files, args.length, args.quiet, args.status, args.warn,
+                           args.ignore_missing, args.strict, args.jobs):
+            sys.exit(1)
         return
 
-    # Hash calculation mode
-    for file_path in args.files:
+    def compute(file_path):
         if not file_path.exists():
+            return None
+        return calculate_b2sum(file_path, args.length)
+
+    # Hash calculation mode, in parallel but printed in argument order
+    for file_path, result in zip(args.files, ordered_map(compute, args.files, args.jobs)):
+        if result is None:
             print(f"Error: {file_path} does not exist", file=sys.stderr)
             continue
 
-        hash_value, error = calculate_b2sum(file_path, args.length)
+        hash_value, error = result
         
         if error:
             print(error, file=sys.stderr)
         else:
             print(f"{hash_value}  {file_path}")
 
-def check_files(checksum_files):
+def check_files(checksum_files, hash_length=None, quiet=False, status=False, warn=False,
+                ignore_missing=False, strict=False, jobs=1):
     """
-    Verify checksums stored in files.
+    Verify checksums stored in files, in GNU or BSD (--tag) format.
     
     Args:
         checksum_files (list): List of files containing checksums to verify
+        hash_length (int, optional): Expected digest length in bytes; by default
+            it is taken from each line
+        quiet (bool): Do not print OK lines
+        status (bool): Print nothing, only return the result
+        warn (bool): Warn about improperly formatted lines
+        ignore_missing (bool): Skip listed files that do not exist
+        strict (bool): Fail on improperly formatted lines
+        jobs (int): Number of files verified at a time
+    
+    Returns:
+        bool: True if every listed file matched
     """
-    for checksum_file in checksum_files:
-        try:
-            with open(checksum_file, 'r') as f:
-                for line in f:
-                    # Parse checksum file format: <hash>  <filename>
-                    try:
-                        stored_hash, filename = line.strip().split('  ', 1)
-                        file_path = Path(filename)
-                        
-                        if not file_path.exists():
-                            print(f"{filename}: FAILED (file not found)")
-                            continue
-                            
-                        calculated_hash, error = calculate_b2sum(file_path)
-                        
-                        if error:
-                            print(f"{filename}: FAILED ({error})")
-                        elif calculated_hash == stored_hash:
-                            print(f"{filename}: OK")
-                        else:
-                            print(f"{filename}: FAILED (hash mismatch)")
-                            
-                    except ValueError:
-                        print(f"Invalid line format in {checksum_file}")
-                        
-        except Exception as e:
-            print(f"Error reading {checksum_file}: {str(e)}", file=sys.stderr)
+    return check_manifests([str(path) for path in checksum_files], 'b2sum', 'blake2b',
+                           hash_length, jobs=jobs, quiet=quiet, status=status, warn=warn,
+                           ignore_missing=ignore_missing, strict=strict)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+'''
+Name: Hamdy Abou El Anein
+Email: hamdy.aea@protonmail.com
+Date of creation:  19-10-2026
+Last update: 19-10-2026
+Version: 1.0
+Description: Benchmark of find.py --jobs over a synthetic tree
+Example of use: python3 bench_find.py --entries 1000000 --jobs 1 2 4 8
+'''
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+FIND = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'find.py')
+
+# Expressions timed: name only (no stat()) and one needing a stat() per file
+EXPRESSIONS = [
+    ['-name', '*7*'],
+    ['-type', 'f', '-size', '+0c'],
+]
+
+def build_tree(root, entries, fanout, files_per_dir):
+    """Create about entries files and directories below root, breadth first."""
+    created = 0
+    level = [root]
+    while created < entries:
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                if created >= entries:
+                    return created
+                with open(os.path.join(directory, f'file{i}'), 'wb') as f:
+                    f.write(b'x' * (i % 3))
+                created += 1
+            for i in range(fanout):
+                if created >= entries:
+                    return created
+                path = os.path.join(directory, f'dir{i}')
+                os.mkdir(path)
+                next_level.append(path)
+                created += 1
+        level = next_level
+    return created
+
+def drop_caches():
+    """Empty the page, dentry and inode caches (Linux, needs root)."""
+    os.sync()
+    with open('/proc/sys/vm/drop_caches', 'w') as f:
+        f.write('3\n')
+
+def run(root, expression, jobs, ordered, cold=False):
+    """Time one find.py run, returning (seconds, lines printed)."""
+    if cold:
+        drop_caches()
+    command = [sys.executable, FIND, f'--jobs={jobs}']
+    if not ordered:
+        command.append('--unordered')
+    command += [root] + expression
+    start = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.PIPE, check=True)
+    return time.perf_counter() - start, result.stdout.count(b'\n')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark find.py --jobs over a synthetic tree')
+    parser.add_argument('--entries', type=int, default=1000000, help='Files and directories to create')
+    parser.add_argument('--fanout', type=int, default=10, help='Subdirectories per directory')
+    parser.add_argument('--files', type=int, default=40, help='Files per directory')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8], help='Thread counts to time')
+    parser.add_argument('--root', help='Reuse (or create) the tree in this directory and keep it')
+    parser.add_argument('--cold', action='store_true',
+                        help='Drop the kernel caches before each run, as for a tree not read recently')
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix='bench_find.')
+    try:
+        os.makedirs(root, exist_ok=True)
+        if not os.listdir(root):
+            start = time.perf_counter()
+            created = build_tree(root, args.entries, args.fanout, args.files)
+            print(f"Created {created} entries in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'expression':<24} {'jobs':>4} {'order':<9} {'seconds':>8} {'speedup':>8} {'lines':>9}")
+        for expression in EXPRESSIONS:
+            baseline = None
+            for jobs in args.jobs:
+                for ordered in ([True] if jobs == 1 else [True, False]):
+                    seconds, lines = run(root, expression, jobs, ordered, args.cold)
+                    if baseline is None:
+                        baseline = seconds
+                    print(f"{' '.join(expression):<24} {jobs:>4} {'ordered' if ordered else 'unordered':<9} "
+                          f"{seconds:>8.2f} {baseline / seconds:>7.2f}x {lines:>9}")
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
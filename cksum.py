@@ -9,10 +9,12 @@ Description: The cksum command from coreutils in Python3.
 Example of use: python3 cksum.py -a sha256 file.txt
 '''
 import sys
-import hashlib
 import base64
 import os
 
+from hashsum import (CHECK_OPTIONS, TAGS, check_manifests, check_option_defaults, hash_file,
+                     jobs_argument, new_hash, ordered_map)
+
 def print_help():
     help_text = """
     Usage: cksum [OPTION]... [FILE]...
@@ -27,6 +29,9 @@ def print_help():
       --tag                  create a BSD-style checksum (the default)
       --untagged             create an untagged checksum
       -z, --zero             end each output line with NUL instead of newline
+      --quiet, --status, -w/--warn, --strict, --ignore-missing
+                             with --check, as in md5sum
+      -j, --jobs=N           checksum N files at a time
       --help                 display this help and exit
       --version              output version information and exit
 
@@ -41,14 +46,12 @@ def print_version():
 
 def compute_checksum(filepath, algorithm="crc32", base64_output=False, raw_output=False, untagged=False):
     try:
-        hash_func = hashlib.new(algorithm)
+        new_hash(algorithm)
     except ValueError:
         print(f"Error: Unsupported algorithm '{algorithm}'")
         sys.exit(1)
         
-    with open(filepath, "rb") as file:
-        while chunk := file.read(4096):
-            hash_func.update(chunk)
+    hash_func = hash_file(filepath, algorithm)
 
     digest = hash_func.digest() if raw_output else hash_func.hexdigest()
 
@@ -58,50 +61,69 @@ def compute_checksum(filepath, algorithm="crc32", base64_output=False, raw_outpu
     if untagged:
         output = f"{digest}  {filepath}"
     else:
-        output = f"{algorithm.upper()} ({filepath}) = {digest}"
+        output = f"{TAGS.get(algorithm, algorithm.upper())} ({filepath}) = {digest}"
         
-    print(output)
+    return output
 
 def main():
     algorithm = "crc32"
     base64_output = False
     raw_output = False
     untagged = False
+    check = False
+    algorithm_given = False
+    check_options = check_option_defaults()
+    jobs = 1
     files = []
 
-    i = 1
-    while i < len(sys.argv):
-        arg = sys.argv[i]
+    args = iter(sys.argv[1:])
+    for arg in args:
         if arg in ("--help", "-h"):
             print_help()
             return
-        elif arg in ("--version"):
+        elif arg == "--version":
             print_version()
             return
         elif arg.startswith("--algorithm=") or arg == "-a":
-            algorithm = arg.split("=")[1] if "=" in arg else sys.argv[i+1]
-            if "=" not in arg:
-                i += 1
+            algorithm = arg.split("=")[1] if "=" in arg else next(args, "")
+            algorithm_given = True
         elif arg == "--base64":
             base64_output = True
         elif arg == "--raw":
             raw_output = True
         elif arg == "--untagged":
             untagged = True
+        elif arg in ("-c", "--check"):
+            check = True
+        elif arg in CHECK_OPTIONS:
+            check_options[CHECK_OPTIONS[arg]] = True
+        elif (value := jobs_argument(arg, args, "cksum")) is not None:
+            jobs = value
         else:
             files.append(arg)
-        i += 1
+
+    if check:
+        # Without -a, each tagged line names its own algorithm
+        if not check_manifests(files or ["-"], "cksum", algorithm if algorithm_given else None,
+                               jobs=jobs, **check_options):
+            sys.exit(1)
+        return
 
     if not files:
         print("Error: No files specified")
         sys.exit(1)
 
-    for filepath in files:
-        if os.path.isfile(filepath):
-            compute_checksum(filepath, algorithm, base64_output, raw_output, untagged)
-        else:
+    def compute(filepath):
+        if not os.path.isfile(filepath):
+            return None
+        return compute_checksum(filepath, algorithm, base64_output, raw_output, untagged)
+
+    # Checksum jobs files at a time, printing in argument order
+    for filepath, output in zip(files, ordered_map(compute, files, jobs)):
+        if output is None:
             print(f"Error: File not found - {filepath}")
             sys.exit(1)
+        print(output)
 
 if __name__ == "__main__":
     main()
@@ -13,42 +13,368 @@ import os
 import sys
 import shutil
 import stat
+import errno
+import fcntl
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ioctl cloning a whole file on reflink capable filesystems (linux/fs.h)
+FICLONE = 0x40049409
+
+# Bytes per copy_file_range()/sendfile() call, and the userspace buffer size
+KERNEL_CHUNK = 1024 * 1024 * 1024
+BUFFER_SIZE = 1024 * 1024
+
+# Hashes the source side of --checksum comparisons while the caller hashes the destination
+HASH_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Granularity of the zero detection done by --sparse=always
+SPARSE_BLOCK = 4096
+ZERO_BLOCK = bytes(SPARSE_BLOCK)
+
+def data_extents(fd, size):
+    """Yield (offset, length) of the data regions of fd, using SEEK_DATA/SEEK_HOLE."""
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+            end = os.lseek(fd, start, os.SEEK_HOLE)
+        except OSError as e:
+            if e.errno == errno.ENXIO:  # Only a hole is left
+                return
+            if e.errno != errno.EINVAL:
+                raise
+            # No SEEK_DATA support: treat the rest as data
+            start, end = offset, size
+        yield start, min(end, size) - start
+        offset = end
+
+def copy_range(src_fd, dst_fd, offset, length, skip_zeros=False):
+    """Copy length bytes at offset from src_fd to the same offset in dst_fd."""
+    end = offset + length
+    if not skip_zeros and hasattr(os, 'copy_file_range'):
+        try:
+            while offset < end:
+                n = os.copy_file_range(src_fd, dst_fd, end - offset, offset, offset)
+                if n == 0:
+                    return
+                offset += n
+            return
+        except OSError:
+            pass  # Fall back to pread/pwrite from where we got to
+
+    while offset < end:
+        data = os.pread(src_fd, min(BUFFER_SIZE, end - offset), offset)
+        if not data:
+            return
+        view = memoryview(data)
+        for i in range(0, len(data), SPARSE_BLOCK):
+            block = view[i:i + SPARSE_BLOCK]
+            if skip_zeros and block == ZERO_BLOCK[:len(block)]:
+                continue  # Leave a hole
+            os.pwrite(dst_fd, block, offset + i)
+        offset += len(data)
+
+def copy_sparse(src_fd, dst_fd, size, skip_zeros=False):
+    """Copy only the data extents of src_fd, leaving holes in dst_fd elsewhere."""
+    os.ftruncate(dst_fd, size)
+    for offset, length in data_extents(src_fd, size):
+        copy_range(src_fd, dst_fd, offset, length, skip_zeros)
+
+def copy_data(src_fd, dst_fd, reflink='auto', sparse='auto'):
+    """
+    Copy the contents of src_fd to dst_fd with the cheapest method available.
+    
+    Tries a reflink clone (FICLONE), then a hole-preserving extent copy for
+    sparse sources (--sparse), then copy_file_range(), then sendfile(), and
+    finally a plain read/write loop.
+    """
+    if reflink != 'never':
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return
+        except OSError:
+            if reflink == 'always':
+                raise
+
+    if sparse != 'never' and stat.S_ISREG(os.fstat(dst_fd).st_mode):
+        src_stat = os.fstat(src_fd)
+        # Fewer allocated blocks than the size means the file has holes
+        if sparse == 'always' or src_stat.st_blocks * 512 < src_stat.st_size:
+            copy_sparse(src_fd, dst_fd, src_stat.st_size, skip_zeros=sparse == 'always')
+            return
+
+    for kernel_copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+        if kernel_copy is None:
+            continue
+        copied = 0
+        try:
+            while True:
+                if kernel_copy is os.sendfile:
+                    n = os.sendfile(dst_fd, src_fd, None, KERNEL_CHUNK)
+                else:
+                    n = kernel_copy(src_fd, dst_fd, KERNEL_CHUNK)
+                if n == 0:
+                    return
+                copied += n
+        except OSError:
+            # Unsupported for these files (cross device, old kernel...): try the next method
+            if copied:
+                raise
+
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(src_fd, 'rb', buffering=0, closefd=False) as src, \
+         open(dst_fd, 'wb', buffering=0, closefd=False) as dst:
+        while True:
+            n = src.readinto(buffer)
+            if not n:
+                break
+            written = 0
+            while written < n:
+                written += dst.write(view[written:n])
+
+def file_digest(path):
+    """Return the SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.digest()
+
+def is_up_to_date(src, dst, src_stat, update='all', checksum=False):
+    """
+    Decide from one stat of dst whether copying src over it can be skipped.
+    
+    --update=none keeps any existing destination, --update=older one with the
+    same size and an mtime at least as new, and --checksum one with the same
+    size and the same contents.
+    """
+    if update == 'all' and not checksum:
+        return False
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+
+    if update == 'none':
+        return True
+    if dst_stat.st_size != src_stat.st_size:
+        return False
+    if update == 'older' and dst_stat.st_mtime_ns >= src_stat.st_mtime_ns:
+        return True
+    if checksum:
+        src_digest = HASH_POOL.submit(file_digest, src)
+        return file_digest(dst) == src_digest.result()
+    return False
+
+class HardLinkMap:
+    """
+    Destination paths of multiply linked sources, keyed by (st_dev, st_ino).
+    
+    The first copy of an inode claims it; later names of the same inode are
+    hard linked to that copy instead of being copied again (--preserve=links).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.copies = {}
+
+    def claim(self, src_stat, dst):
+        """Return the path to link dst to, or None if dst is the first copy."""
+        key = (src_stat.st_dev, src_stat.st_ino)
+        with self.lock:
+            first = self.copies.get(key)
+            if first is None:
+                self.copies[key] = (dst, threading.Event())
+                return None
+        # Another thread may still be creating the first copy
+        first[1].wait()
+        return first[0]
+
+    def release(self, src_stat):
+        """Mark the first copy of an inode as present on disk."""
+        self.copies[(src_stat.st_dev, src_stat.st_ino)][1].set()
+
+def same_file(src_stat, dst, follow_symlinks=True):
+    """Whether dst already is the file described by src_stat (same device and inode)."""
+    try:
+        dst_stat = os.stat(dst) if follow_symlinks else os.lstat(dst)
+    except OSError:
+        return False
+    return (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino)
+
+def copy_file(src, dst, follow_symlinks=True, preserve_attrs=False, reflink='auto', sparse='auto',
+              update='all', checksum=False, links=None):
+    """
+    Copy a single file, optionally preserving attributes.
+    
+    links is a HardLinkMap when hard links should be preserved.
+    Returns False if the destination was up to date and left alone, or is
+    the source itself (the same file, a hard link or a symlink to it).
+    """
+    if not follow_symlinks and os.path.islink(src):
+        if same_file(os.lstat(src), dst, follow_symlinks=False):
+            print(f"cp: '{src}' and '{dst}' are the same file", file=sys.stderr)
+            return False
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        os.symlink(os.readlink(src), dst)
+        return True
+
+    src_stat = os.stat(src)
+    # Opening dst with O_TRUNC would empty the source
+    if same_file(src_stat, dst):
+        print(f"cp: '{src}' and '{dst}' are the same file", file=sys.stderr)
+        return False
+
+    if links is not None and src_stat.st_nlink > 1:
+        first = links.claim(src_stat, dst)
+        if first is None:
+            try:
+                return copy_file(src, dst, follow_symlinks, preserve_attrs, reflink, sparse,
+                                 update, checksum)
+            finally:
+                links.release(src_stat)
+        if os.path.lexists(dst):
+            if os.path.samefile(first, dst):
+                return False
+            os.unlink(dst)
+        os.link(first, dst)
+        return True
+
+    if is_up_to_date(src, dst, src_stat, update, checksum):
+        return False
+
+    if not stat.S_ISREG(src_stat.st_mode):
+        # Devices, FIFOs...: leave them to shutil
+        if preserve_attrs:
+            shutil.copy2(src, dst)
+        else:
+            shutil.copy(src, dst)
+        return True
+
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IMODE(src_stat.st_mode))
+        try:
+            copy_data(src_fd, dst_fd, reflink, sparse)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
 
-def copy_file(src, dst, follow_symlinks=True, preserve_attrs=False):
-    """Copy a single file, optionally preserving attributes."""
     if preserve_attrs:
-        shutil.copy2(src, dst)  # Copy file with metadata
+        shutil.copystat(src, dst)  # Copy file with metadata
     else:
-        shutil.copy(src, dst)  # Copy file without metadata
-
-def copy_directory(src, dst, follow_symlinks=True, preserve_attrs=False):
-    """Recursively copy a directory."""
-    if not os.path.exists(dst):
-        os.makedirs(dst)
-    for item in os.listdir(src):
-        s = os.path.join(src, item)
-        d = os.path.join(dst, item)
-        if os.path.isdir(s):
-            copy_directory(s, d, follow_symlinks, preserve_attrs)
-        else:
-            copy_file(s, d, follow_symlinks, preserve_attrs)
+        shutil.copymode(src, dst)  # Copy file without metadata
+    return True
+
+def walk_tree(src, dst, follow_symlinks=True):
+    """
+    Walk src with os.scandir, yielding ('dir', s, d) and ('file', s, d) tasks.
+    
+    Every directory is yielded before any of its children.
+    """
+    stack = [(src, dst)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        yield 'dir', src_dir, dst_dir
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                d = os.path.join(dst_dir, entry.name)
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    stack.append((entry.path, d))
+                else:
+                    yield 'file', entry.path, d
+
+def copy_directory(src, dst, follow_symlinks=True, preserve_attrs=False, jobs=1, **copy_options):
+    """
+    Recursively copy a directory.
+    
+    With jobs > 1 the files are copied by a thread pool while the walk goes
+    on; the kernel copy calls release the GIL. Directory metadata is applied
+    last, deepest first, so copying the contents cannot disturb it.
+    Other keyword arguments are passed on to copy_file().
+    
+    Returns the number of files copied and the number skipped as up to date.
+    """
+    directories = []
+    executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    # Bound the queued copies so huge trees are not held in memory as futures
+    slots = threading.BoundedSemaphore(jobs * 4)
+    lock = threading.Lock()
+    counts = {True: 0, False: 0}
+    errors = []
+
+    def finished(future):
+        with lock:
+            if future.exception() is not None:
+                errors.append(future.exception())
+            else:
+                counts[future.result()] += 1
+        slots.release()
+
+    try:
+        for kind, s, d in walk_tree(src, dst, follow_symlinks):
+            if kind == 'dir':
+                if not os.path.exists(d):
+                    os.makedirs(d)
+                directories.append((s, d))
+            elif executor is None:
+                counts[copy_file(s, d, follow_symlinks, preserve_attrs, **copy_options)] += 1
+            else:
+                slots.acquire()
+                future = executor.submit(copy_file, s, d, follow_symlinks, preserve_attrs, **copy_options)
+                future.add_done_callback(finished)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    if errors:
+        raise errors[0]
+
+    if preserve_attrs:
+        for s, d in reversed(directories):
+            shutil.copystat(s, d)
+    return counts[True], counts[False]
 
 def cp(src, dst, options):
-    """Main copy function."""
+    """
+    Main copy function.
+    
+    Returns the number of files copied and the number skipped as up to date.
+    """
     if not os.path.exists(src):
         print(f"Source {src} does not exist.")
-        return
+        return 0, 0
 
+    copy_options = {
+        'reflink': options.get('reflink'),
+        'sparse': options.get('sparse'),
+        'update': options.get('update'),
+        'checksum': options.get('checksum'),
+        'links': options.get('links'),
+    }
     if os.path.isdir(src):
         if options.get('recursive'):
-            copy_directory(src, dst, follow_symlinks=not options.get('no_dereference'), preserve_attrs=options.get('preserve'))
-        else:
-            print(f"{src} is a directory; use -R to copy it recursively.")
-    else:
-        # If src is a file
-        if os.path.isdir(dst):
-            dst = os.path.join(dst, os.path.basename(src))  # Target directory
-        copy_file(src, dst, follow_symlinks=not options.get('no_dereference'), preserve_attrs=options.get('preserve'))
+            return copy_directory(src, dst, follow_symlinks=not options.get('no_dereference'),
+                                  preserve_attrs=options.get('preserve'), jobs=options.get('jobs'),
+                                  **copy_options)
+        print(f"{src} is a directory; use -R to copy it recursively.")
+        return 0, 0
+
+    # If src is a file
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))  # Target directory
+    copied = copy_file(src, dst, follow_symlinks=not options.get('no_dereference'),
+                       preserve_attrs=options.get('preserve'), **copy_options)
+    return (1, 0) if copied else (0, 1)
 
 def main():
     # Default options
@@ -59,6 +385,12 @@ def main():
         'interactive': False,
         'no_dereference': False,
         'verbose': False,
+        'reflink': 'auto',
+        'jobs': 1,
+        'sparse': 'auto',
+        'update': 'all',
+        'checksum': False,
+        'preserve_links': False,
     }
 
     # Parse arguments
@@ -72,6 +404,23 @@ def main():
                 options['recursive'] = True
             elif arg in ('-p', '--preserve'):
                 options['preserve'] = True
+            elif arg.startswith('--preserve='):
+                for attr in arg.partition('=')[2].split(','):
+                    if attr in ('mode', 'ownership', 'timestamps'):
+                        options['preserve'] = True
+                    elif attr == 'links':
+                        options['preserve_links'] = True
+                    elif attr == 'all':
+                        options['preserve'] = True
+                        options['preserve_links'] = True
+                    else:
+                        print(f"cp: invalid argument '{attr}' for '--preserve'")
+                        return
+            elif arg in ('-a', '--archive'):
+                options['recursive'] = True
+                options['no_dereference'] = True
+                options['preserve'] = True
+                options['preserve_links'] = True
             elif arg in ('-f', '--force'):
                 options['force'] = True
             elif arg in ('-i', '--interactive'):
@@ -80,15 +429,50 @@ def main():
                 options['no_dereference'] = True
             elif arg in ('-v', '--verbose'):
                 options['verbose'] = True
+            elif arg == '--reflink' or arg.startswith('--reflink='):
+                when = arg.partition('=')[2] or 'always'
+                if when not in ('auto', 'always', 'never'):
+                    print(f"cp: invalid argument '{when}' for '--reflink'")
+                    return
+                options['reflink'] = when
+            elif arg in ('-u', '--update'):
+                options['update'] = 'older'
+            elif arg.startswith('--update='):
+                when = arg.partition('=')[2]
+                if when not in ('all', 'none', 'older'):
+                    print(f"cp: invalid argument '{when}' for '--update'")
+                    return
+                options['update'] = when
+            elif arg == '--checksum':
+                options['checksum'] = True
+            elif arg.startswith('--sparse='):
+                when = arg.partition('=')[2]
+                if when not in ('auto', 'always', 'never'):
+                    print(f"cp: invalid argument '{when}' for '--sparse'")
+                    return
+                options['sparse'] = when
+            elif arg.startswith('--jobs=') or arg.startswith('-j'):
+                value = arg[len('--jobs='):] if arg.startswith('--jobs=') else arg[2:]
+                if not value.isdigit() or int(value) < 1:
+                    print(f"cp: invalid number of jobs: '{value}'")
+                    return
+                options['jobs'] = int(value)
             elif arg in ('--help'):
                 print("Usage: python3 cp.py [OPTION]... SOURCE [SOURCE...] DEST")
                 print("Options:")
                 print("  -R, -r, --recursive    copy directories recursively")
+                print("  -a, --archive          same as -P -R --preserve=all")
                 print("  -p, --preserve         preserve mode, ownership and timestamps")
+                print("  --preserve=ATTR_LIST   preserve the attributes (mode, ownership, timestamps, links, all)")
                 print("  -f, --force            if an existing destination file cannot be opened, remove it and try again")
                 print("  -i, --interactive       prompt before overwrite")
                 print("  -P, --no-dereference   never follow symbolic links in SOURCE")
                 print("  -v, --verbose          explain what is being done")
+                print("  --reflink[=WHEN]       control clone/CoW copies (auto, always, never)")
+                print("  -jN, --jobs=N          copy up to N files of a tree concurrently")
+                print("  --sparse=WHEN          control creation of sparse files (auto, always, never)")
+                print("  -u, --update[=UPDATE]  skip up to date destinations (all, none, older)")
+                print("  --checksum             skip destinations with the same size and contents")
                 print("  --help                 display this help and exit")
                 print("  --version              output version information and exit")
                 return
@@ -108,10 +492,21 @@ def main():
         print("Destination not specified.")
         return
 
+    options['links'] = HardLinkMap() if options['preserve_links'] else None
+
+    copied = skipped = 0
     for source in src:
         if options['verbose']:
             print(f"Copying {source} to {dst}")
-        cp(source, dst, options)
+        try:
+            source_copied, source_skipped = cp(source, dst, options)
+            copied += source_copied
+            skipped += source_skipped
+        except OSError as e:
+            print(f"cp: cannot copy '{source}': {e.strerror}")
+
+    if options['update'] != 'all' or options['checksum']:
+        print(f"{copied} files copied, {skipped} skipped")
 
 if __name__ == "__main__":
     main()
@@ -12,31 +12,124 @@ Example of use: python3 dd.py if=source.img of=destination.img
 
 import os
 import sys
+import json
+import mmap
+import fcntl
 import time
 import signal
+import stat
+import queue
 import argparse
+import threading
 from datetime import datetime
 from typing import BinaryIO, Optional, Dict, Any
 
+# Number of buffers in flight between the reader and writer threads (oflag=async)
+ASYNC_BUFFERS = 4
+
+# Transfer lengths must be a multiple of this for O_DIRECT
+DIRECT_ALIGN = 512
+
+# conv= values that rewrite the data (see convert_block)
+CONVERSIONS = {'lcase', 'ucase', 'ascii'}
+
+# Bytes handed to the kernel per copy_file_range/sendfile call
+OFFLOAD_CHUNK = 64 * 1024**2
+
+# iflag=/oflag= values that map onto open(2) flags
+OPEN_FLAGS = {
+    'direct': 'O_DIRECT',
+    'dsync': 'O_DSYNC',
+    'sync': 'O_SYNC',
+}
+
+# Seconds between status=progress/json reports
+PROGRESS_INTERVAL = 1.0
+
 class DDStats:
-    def __init__(self):
+    def __init__(self, status: str = ''):
         self.bytes_copied = 0
         self.start_time = time.time()
         self.blocks_in = 0
         self.blocks_out = 0
         self.partial_in = 0
         self.partial_out = 0
+        self.status = status
+        self.total_size = None  # Expected bytes, when the input size is known
+        self.last_time = self.start_time
+        self.last_bytes = 0
+        self.progress_shown = False
+
+    def records(self) -> tuple:
+        """Return the records in/out counters in dd's N+M notation."""
+        records_in = f"{self.blocks_in}+{self.partial_in}" if self.partial_in else str(self.blocks_in)
+        records_out = f"{self.blocks_out}+{self.partial_out}" if self.partial_out else str(self.blocks_out)
+        return records_in, records_out
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters, average rate, throughput since the last snapshot and ETA."""
+        now = time.time()
+        elapsed = max(now - self.start_time, 0.000001)
+        copied = self.bytes_copied
+        interval = now - self.last_time
+        current = (copied - self.last_bytes) / interval if interval > 0 else 0.0
+        self.last_time, self.last_bytes = now, copied
+
+        rate = copied / elapsed
+        eta = None
+        if self.total_size is not None and rate > 0:
+            eta = max(self.total_size - copied, 0) / rate
+
+        records_in, records_out = self.records()
+        return {
+            'bytes': copied,
+            'total_bytes': self.total_size,
+            'elapsed': round(elapsed, 6),
+            'rate': round(rate, 1),
+            'current_rate': round(current, 1),
+            'eta': None if eta is None else round(eta, 1),
+            'records_in': records_in,
+            'records_out': records_out,
+        }
+
+    def print_progress(self) -> None:
+        """Print one periodic status line on stderr (status=progress/json)."""
+        info = self.snapshot()
+        if self.status == 'json':
+            print(json.dumps(info), file=sys.stderr, flush=True)
+            return
+
+        line = (
+            f"{info['bytes']} bytes ({info['bytes']/1024/1024:.1f} MB) copied, "
+            f"{info['elapsed']:.0f} s, {info['current_rate']/1024/1024:.1f} MB/s"
+        )
+        if info['eta'] is not None:
+            line += f", ETA {info['eta']:.0f} s"
+        # Pad so a shorter line fully covers the previous one
+        print(f"\r{line:<79}", end='', file=sys.stderr, flush=True)
+        self.progress_shown = True
+
+    def end_progress(self) -> None:
+        """Terminate the status=progress line before the final statistics."""
+        if self.progress_shown:
+            print(file=sys.stderr)
+            self.progress_shown = False
 
     def print_stats(self, final: bool = False) -> None:
         """Print transfer statistics."""
+        if self.status == 'json':
+            info = self.snapshot()
+            info['final'] = final
+            print(json.dumps(info), file=sys.stdout if final else sys.stderr)
+            return
+
         elapsed = time.time() - self.start_time
         if elapsed == 0:
             elapsed = 0.000001  # Avoid division by zero
             
         speed = self.bytes_copied / elapsed
         
-        records_in = f"{self.blocks_in}+{self.partial_in}" if self.partial_in else str(self.blocks_in)
-        records_out = f"{self.blocks_out}+{self.partial_out}" if self.partial_out else str(self.blocks_out)
+        records_in, records_out = self.records()
         
         msg = (
             f"{self.bytes_copied} bytes ({self.bytes_copied/1024/1024:.1f} MB) copied, "
@@ -51,10 +144,34 @@ class DDStats:
         else:
             print(msg, file=sys.stderr)
 
+class ProgressReporter(threading.Thread):
+    """Background timer printing DDStats progress at a fixed interval."""
+
+    def __init__(self, stats: DDStats, interval: float = PROGRESS_INTERVAL):
+        super().__init__(name='dd-progress', daemon=True)
+        self.stats = stats
+        self.interval = interval
+        self.finished = threading.Event()
+
+    def run(self) -> None:
+        while not self.finished.wait(self.interval):
+            self.stats.print_progress()
+
+    def stop(self) -> None:
+        """Stop reporting and close the progress line."""
+        self.finished.set()
+        self.join()
+        self.stats.end_progress()
+
 class DD:
     def __init__(self, args: Dict[str, str]):
         self.args = args
-        self.stats = DDStats()
+        self.stats = DDStats(args.get('status', ''))
+        self.aligned = False
+        self.direct_out = False
+        self.out_buffer = None
+        self.zero_block = None
+        self.sparse_pending = False
         self.setup_signal_handlers()
 
     def setup_signal_handlers(self) -> None:
@@ -68,19 +185,71 @@ class DD:
 
     def handle_sigint(self, signum: int, frame: Any) -> None:
         """Handle SIGINT (Ctrl+C) by printing final statistics and exiting."""
+        self.stats.end_progress()
         self.stats.print_stats(final=True)
         sys.exit(130)  # 128 + SIGINT(2)
 
-    def open_file(self, filename: str, mode: str) -> BinaryIO:
+    def open_file(self, filename: str, mode: str, flags: int = 0) -> BinaryIO:
         """Open a file or device with proper handling of special files."""
         if filename == '-':
-            return sys.stdin.buffer if 'r' in mode else sys.stdout.buffer
+            # A fresh file object on the descriptor, so closing it leaves stdin/stdout open
+            stream = sys.stdin if 'r' in mode else sys.stdout
+            stream.flush()
+            return open(stream.fileno(), mode, closefd=False)
         
         if filename in ['/dev/null', 'NUL']:
             return open(os.devnull, mode)
+
+        if flags:
+            # Extra open(2) flags need a raw descriptor; skip Python's buffering too
+            access = os.O_RDONLY if 'r' in mode else os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+            fd = os.open(filename, access | flags, 0o666)
+            return open(fd, mode, buffering=0)
             
         return open(filename, mode)
 
+    def open_flags(self, flags: set) -> int:
+        """Translate iflag=/oflag= values into open(2) flags."""
+        result = 0
+        for flag in flags:
+            if flag not in OPEN_FLAGS:
+                continue
+            value = getattr(os, OPEN_FLAGS[flag], None)
+            if value is None:
+                print(f"dd: {flag} I/O is not supported on this system", file=sys.stderr)
+                sys.exit(1)
+            result |= value
+        return result
+
+    def allocate_buffer(self, size: int):
+        """Allocate an I/O buffer, page aligned (mmap backed) for direct I/O."""
+        if self.aligned:
+            return mmap.mmap(-1, size)
+        return bytearray(size)
+
+    def write_chunk(self, outf: BinaryIO, chunk) -> int:
+        """Write one output chunk, staging it in an aligned buffer for O_DIRECT."""
+        size = len(chunk)
+        if self.zero_block is not None and self.zero_block[:size] == chunk:
+            # conv=sparse: leave a hole instead of writing NUL bytes
+            outf.seek(size, os.SEEK_CUR)
+            self.sparse_pending = True
+            return size
+        self.sparse_pending = False
+
+        if not self.direct_out:
+            return outf.write(chunk)
+
+        if size % DIRECT_ALIGN:
+            # The final partial block cannot be written with O_DIRECT, drop the flag
+            fd = outf.fileno()
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_DIRECT)
+            self.direct_out = False
+            return outf.write(chunk)
+
+        self.out_buffer[:size] = chunk
+        return outf.write(memoryview(self.out_buffer)[:size])
+
     def convert_size(self, size_str: str) -> int:
         """Convert size string with optional suffix to bytes."""
         if not size_str:
@@ -99,6 +268,203 @@ class DD:
             return int(size_str[:-1]) * suffixes[size_str[-1]]
         return int(size_str)
 
+    def parse_flags(self, key: str) -> set:
+        """Parse a comma separated flag operand (conv=, iflag=, oflag=)."""
+        return {flag for flag in self.args.get(key, '').split(',') if flag}
+
+    def convert_block(self, data: bytearray, conv_flags: set) -> bytearray:
+        """Apply the requested conversions to a block of input data."""
+        if 'lcase' in conv_flags:
+            data = data.lower()
+        if 'ucase' in conv_flags:
+            data = data.upper()
+        if 'ascii' in conv_flags:
+            data = data.decode('ascii').encode('ascii')
+        return data
+
+    def block_data(self, buffer, bytes_read: int, conv_flags: set):
+        """Return the block read into buffer, as a view of it when nothing needs converting."""
+        if conv_flags & CONVERSIONS:
+            return self.convert_block(buffer[:bytes_read], conv_flags)
+        return memoryview(buffer)[:bytes_read]
+
+    def write_block(self, outf: BinaryIO, data: bytearray, obs: int, conv_flags: set) -> None:
+        """Write one input block to the output in obs-sized chunks."""
+        for i in range(0, len(data), obs):
+            chunk = data[i:i + obs]
+            bytes_written = self.write_chunk(outf, chunk)
+
+            # Update output statistics
+            if bytes_written == obs:
+                self.stats.blocks_out += 1
+            else:
+                self.stats.partial_out += 1
+
+            self.stats.bytes_copied += bytes_written
+
+            # Sync if requested
+            if 'fsync' in conv_flags:
+                outf.flush()
+                os.fsync(outf.fileno())
+
+    def count_input(self, bytes_read: int, ibs: int) -> None:
+        """Update input statistics for one read."""
+        if bytes_read == ibs:
+            self.stats.blocks_in += 1
+        else:
+            self.stats.partial_in += 1
+
+    def expected_size(self, inf: BinaryIO, ibs: int, count: int, skip: int) -> Optional[int]:
+        """Work out how many bytes will be copied, if the input size is known."""
+        try:
+            mode = os.fstat(inf.fileno()).st_mode
+            if stat.S_ISREG(mode):
+                size = os.fstat(inf.fileno()).st_size
+            elif stat.S_ISBLK(mode):
+                size = inf.seek(0, os.SEEK_END)
+                inf.seek(0)
+            else:
+                size = None
+        except (AttributeError, OSError):
+            size = None
+
+        if size is None:
+            return count * ibs if count else None
+        size = max(size - skip * ibs, 0)
+        return min(size, count * ibs) if count else size
+
+    def copy_offload(self, inf: BinaryIO, outf: BinaryIO, ibs: int, obs: int,
+                     count: int) -> bool:
+        """
+        Let the kernel move the data with copy_file_range() or sendfile().
+
+        Only used for plain copies of a regular input file. Returns False,
+        having copied nothing, if neither call works for these files so the
+        caller can fall back to the userspace loop.
+        """
+        try:
+            in_fd = inf.fileno()
+            out_fd = outf.fileno()
+            if not stat.S_ISREG(os.fstat(in_fd).st_mode):
+                return False
+            out_regular = stat.S_ISREG(os.fstat(out_fd).st_mode)
+        except (AttributeError, OSError):
+            return False
+
+        methods = []
+        if out_regular and hasattr(os, 'copy_file_range'):
+            methods.append(lambda n: os.copy_file_range(in_fd, out_fd, n))
+        if hasattr(os, 'sendfile'):
+            methods.append(lambda n: os.sendfile(out_fd, in_fd, None, n))
+
+        outf.flush()
+        limit = count * ibs if count else None
+        total = 0
+        while methods:
+            chunk = OFFLOAD_CHUNK if limit is None else min(OFFLOAD_CHUNK, limit - total)
+            if chunk <= 0:
+                break
+            try:
+                copied = methods[0](chunk)
+            except OSError:
+                if total:
+                    raise
+                # Not supported for this pair of files, try the next method
+                methods.pop(0)
+                continue
+            if not copied:  # EOF
+                break
+            total += copied
+
+            # Account as the block loop would have for a regular file
+            self.stats.bytes_copied = total
+            self.stats.blocks_in, partial_in = divmod(total, ibs)
+            self.stats.partial_in = 1 if partial_in else 0
+            self.stats.blocks_out, partial_out = divmod(total, obs)
+            self.stats.partial_out = 1 if partial_out else 0
+
+        return bool(methods)
+
+    def copy_sync(self, inf: BinaryIO, outf: BinaryIO, ibs: int, obs: int,
+                  count: int, conv_flags: set) -> None:
+        """Read and write blocks one after another in the calling thread."""
+        buffer = self.allocate_buffer(ibs)
+        blocks_copied = 0
+
+        while True:
+            if count and blocks_copied >= count:
+                break
+
+            # Read input
+            bytes_read = inf.readinto(buffer)
+            if not bytes_read:  # EOF
+                break
+
+            self.count_input(bytes_read, ibs)
+            data_to_write = self.block_data(buffer, bytes_read, conv_flags)
+            self.write_block(outf, data_to_write, obs, conv_flags)
+            blocks_copied += 1
+
+    def copy_async(self, inf: BinaryIO, outf: BinaryIO, ibs: int, obs: int,
+                   count: int, conv_flags: set) -> None:
+        """
+        Overlap reads and writes with a reader thread (oflag=async).
+
+        The reader fills a fixed pool of preallocated buffers and hands them
+        to the writer (the calling thread) through a bounded queue; the
+        writer returns each buffer to the pool once it has been written.
+        """
+        free = queue.Queue()
+        filled = queue.Queue(maxsize=ASYNC_BUFFERS)
+        for _ in range(ASYNC_BUFFERS):
+            free.put(self.allocate_buffer(ibs))
+        stop = threading.Event()
+
+        def reader() -> None:
+            blocks_read = 0
+            try:
+                while not stop.is_set():
+                    if count and blocks_read >= count:
+                        break
+                    buffer = free.get()
+                    if buffer is None:
+                        break
+                    bytes_read = inf.readinto(buffer)
+                    if not bytes_read:  # EOF
+                        break
+                    filled.put((buffer, bytes_read))
+                    blocks_read += 1
+                filled.put(None)
+            except BaseException as e:
+                filled.put(e)
+
+        thread = threading.Thread(target=reader, name='dd-reader', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = filled.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                buffer, bytes_read = item
+                self.count_input(bytes_read, ibs)
+                # Without conversions this is a view of buffer: hand it back only once written
+                data_to_write = self.block_data(buffer, bytes_read, conv_flags)
+                self.write_block(outf, data_to_write, obs, conv_flags)
+                free.put(buffer)
+        finally:
+            # Unblock the reader if the writer stops early
+            stop.set()
+            free.put(None)
+            while thread.is_alive():
+                try:
+                    filled.get_nowait()
+                except queue.Empty:
+                    pass
+                thread.join(0.01)
+
     def copy(self) -> None:
         """Perform the copy operation."""
         # Convert sizes
@@ -108,11 +474,28 @@ class DD:
         count = self.convert_size(self.args.get('count', ''))
         skip = self.convert_size(self.args.get('skip', ''))
         seek = self.convert_size(self.args.get('seek', ''))
+        conv_flags = self.parse_flags('conv')
+        iflags = self.parse_flags('iflag')
+        oflags = self.parse_flags('oflag')
+
+        # Direct I/O needs page aligned buffers on both sides
+        self.aligned = 'direct' in iflags or 'direct' in oflags
+        self.direct_out = 'direct' in oflags
+        if self.direct_out:
+            self.out_buffer = mmap.mmap(-1, obs)
+        offload = not (conv_flags - {'fsync'}) and not iflags and not oflags
 
         try:
-            with self.open_file(self.args['if'], 'rb') as inf, \
-                 self.open_file(self.args['of'], 'wb') as outf:
+            with self.open_file(self.args['if'], 'rb', self.open_flags(iflags)) as inf, \
+                 self.open_file(self.args['of'], 'wb', self.open_flags(oflags)) as outf:
                 
+                self.stats.total_size = self.expected_size(inf, ibs, count, skip)
+
+                # Holes only exist in regular files; pipes and devices get the zeros
+                if 'sparse' in conv_flags and outf.seekable() and \
+                        stat.S_ISREG(os.fstat(outf.fileno()).st_mode):
+                    self.zero_block = memoryview(bytes(obs))
+
                 # Skip input blocks if requested
                 if skip > 0:
                     inf.seek(skip * ibs)
@@ -121,60 +504,30 @@ class DD:
                 if seek > 0:
                     outf.seek(seek * obs)
                 
+                reporter = None
+                if self.stats.status in ('progress', 'json'):
+                    reporter = ProgressReporter(self.stats)
+                    reporter.start()
+
                 # Main copy loop
-                buffer = bytearray(ibs)
-                blocks_copied = 0
-                
-                while True:
-                    if count and blocks_copied >= count:
-                        break
-                    
-                    # Read input
-                    bytes_read = inf.readinto(buffer)
-                    if bytes_read == 0:  # EOF
-                        break
-                    
-                    # Update input statistics
-                    if bytes_read == ibs:
-                        self.stats.blocks_in += 1
+                try:
+                    if offload and self.copy_offload(inf, outf, ibs, obs, count):
+                        pass
+                    elif 'async' in oflags:
+                        self.copy_async(inf, outf, ibs, obs, count, conv_flags)
                     else:
-                        self.stats.partial_in += 1
-                    
-                    # Handle conversion and write output
-                    data_to_write = buffer[:bytes_read]
-                    
-                    # Handle conversion flags
-                    conv_flags = self.args.get('conv', '').split(',')
-                    if conv_flags and conv_flags[0]:
-                        if 'lcase' in conv_flags:
-                            data_to_write = data_to_write.lower()
-                        if 'ucase' in conv_flags:
-                            data_to_write = data_to_write.upper()
-                        if 'ascii' in conv_flags:
-                            data_to_write = data_to_write.decode('ascii').encode('ascii')
-                    
-                    # Write output in obs-sized chunks
-                    for i in range(0, len(data_to_write), obs):
-                        chunk = data_to_write[i:i + obs]
-                        bytes_written = outf.write(chunk)
-                        
-                        # Update output statistics
-                        if bytes_written == obs:
-                            self.stats.blocks_out += 1
-                        else:
-                            self.stats.partial_out += 1
-                        
-                        self.stats.bytes_copied += bytes_written
-                        
-                        # Sync if requested
-                        if conv_flags and 'fsync' in conv_flags:
-                            outf.flush()
-                            os.fsync(outf.fileno())
-                    
-                    blocks_copied += 1
+                        self.copy_sync(inf, outf, ibs, obs, count, conv_flags)
+                finally:
+                    if reporter:
+                        reporter.stop()
+
+                # A trailing hole only exists once the file size covers it
+                # (sparse_pending is only ever set for regular files)
+                if self.sparse_pending:
+                    outf.truncate(outf.tell())
                 
                 # Final sync if requested
-                if conv_flags and 'fsync' in conv_flags:
+                if 'fsync' in conv_flags:
                     outf.flush()
                     os.fsync(outf.fileno())
 
@@ -197,7 +550,7 @@ def parse_command_line() -> Dict[str, str]:
 def main() -> None:
     """Main program entry point."""
     if len(sys.argv) < 3:
-        print("Usage: dd if=SOURCE of=DEST [bs=N] [count=N] [skip=N] [seek=N] [conv=CONV]", file=sys.stderr)
+        print("Usage: dd if=SOURCE of=DEST [bs=N] [count=N] [skip=N] [seek=N] [conv=CONV] [iflag=FLAGS] [oflag=FLAGS] [status=progress|json]", file=sys.stderr)
         sys.exit(1)
         
     args = parse_command_line()
@@ -9,8 +9,18 @@ Description: A clone of the du command from coreutils in Python3
 Example of use: python3 du.py -a -H -d 1
 '''
 import argparse
+import fnmatch
+import json
 import os
+import re
+import queue
+import sqlite3
+import stat
 import sys
+import threading
+
+# Bumped when the cache layout changes, so older cache files are rebuilt
+CACHE_FORMAT = 2
 
 def format_size(size, human_readable):
     """Format size into human-readable format if needed."""
@@ -21,33 +31,274 @@ def format_size(size, human_readable):
             size /= 1024.0
     return str(size)
 
-def du(path, all_files=False, human_readable=False, max_depth=None):
-    """Recursively calculate disk usage for the specified path."""
-    total_size = 0
-    for root, dirs, files in os.walk(path):
-        # Calculate total size of the current directory
-        dir_size = 0
-        for name in files:
-            try:
-                filepath = os.path.join(root, name)
-                size = os.path.getsize(filepath)
-                dir_size += size
-                if all_files:
-                    print(f"{format_size(size, human_readable)}\t{filepath}")
-            except FileNotFoundError:
-                continue
+def compile_excludes(patterns):
+    """Compile shell glob patterns into one regex, or None if there are none."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns))
+
+def read_exclude_file(path):
+    """Read the patterns of an -X/--exclude-from file, one per line."""
+    with open(path) as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+class ScanCache:
+    """
+    Persistent cache of directory scans (--cache), stored with sqlite3.
+
+    Each directory's scan() result is kept with its (st_mtime_ns, st_ino)
+    and reused while both are unchanged, so an unchanged directory costs a
+    single lstat() instead of a scandir() and a stat() per entry. Changes
+    that leave the directory's mtime alone, such as a file growing in
+    place, are only picked up by --verify, which rescans everything and
+    refreshes the cache.
+
+    Directory paths are stored as BLOBs of their os.fsencode() bytes, so
+    names that are not valid UTF-8 work too.
+    """
+
+    def __init__(self, filename, settings, verify=False):
+        self.verify = verify
+        self.lock = threading.Lock()
+        self.updates = {}
+        self.visited = set()
+        self.db = sqlite3.connect(filename, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS dirs "
+                        "(path BLOB PRIMARY KEY, mtime_ns INTEGER, ino INTEGER, result TEXT)")
+        # Results depend on the options (-a, -l, --apparent-size...): start over if they changed
+        settings = f"{CACHE_FORMAT}:{settings}"
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        if row is None or row[0] != settings:
+            self.db.execute("DELETE FROM dirs")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('settings', ?)", (settings,))
+            self.db.commit()
+
+    def get(self, path, st):
+        """Return the cached scan of path if st shows it unchanged, else None."""
+        with self.lock:
+            self.visited.add(path)
+            if self.verify:
+                return None
+            row = self.db.execute("SELECT mtime_ns, ino, result FROM dirs WHERE path = ?",
+                                  (os.fsencode(path),)).fetchone()
+        if row is None or (row[0], row[1]) != (st.st_mtime_ns, st.st_ino):
+            return None
+        files_total, subdirs, files = json.loads(row[2])
+        return (files_total,
+                [tuple(subdir) for subdir in subdirs],
+                [(name, size, tuple(key) if key else None) for name, size, key in files])
+
+    def put(self, path, st, result):
+        """Record a fresh scan of path; written out by save()."""
+        with self.lock:
+            self.updates[path] = (st.st_mtime_ns, st.st_ino, json.dumps(result))
+
+    def save(self, root):
+        """Write the new scans and forget directories below root that are gone."""
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                                [(os.fsencode(path), *values) for path, values in self.updates.items()])
+            # substr() counts bytes on BLOBs, so the prefix length is in bytes too
+            prefix = os.fsencode(os.path.join(root, ''))
+            rows = self.db.execute("SELECT path FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                                   (os.fsencode(root), len(prefix), prefix)).fetchall()
+            visited = {os.fsencode(path) for path in self.visited}
+            self.db.executemany("DELETE FROM dirs WHERE path = ?",
+                                [row for row in rows if row[0] not in visited])
+        self.db.close()
+
+class DiskUsage:
+    """
+    Disk usage engine walking the tree iteratively with os.scandir.
+
+    Sizes come from the DirEntry stat cache, so each entry is stat()ed at
+    most once, and directory totals are rolled up bottom-up from their
+    subdirectories.
+    """
+
+    def __init__(self, all_files=False, human_readable=False, max_depth=None,
+                 apparent_size=False, jobs=1, count_links=False, one_file_system=False,
+                 exclude=None, cache=None):
+        self.all_files = all_files
+        self.human_readable = human_readable
+        self.max_depth = max_depth
+        self.apparent_size = apparent_size
+        self.jobs = jobs
+        self.count_links = count_links
+        self.one_file_system = one_file_system
+        self.exclude = compile_excludes(exclude)
+        self.cache = cache
+        self.root_dev = None
+        self.seen = set()  # (st_dev, st_ino) of multiply linked files already counted
+
+    def size_of(self, st):
+        """Allocated size (st_blocks * 512) or apparent size of a stat result."""
+        if self.apparent_size:
+            return st.st_size
+        return st.st_blocks * 512
 
-        total_size += dir_size
+    def visible(self, depth):
+        """Whether an entry depth levels below the argument is reported."""
+        return self.max_depth is None or depth <= self.max_depth
 
-        # Print directory size if within depth limit
-        if max_depth is None or root.count(os.sep) - path.count(os.sep) < max_depth:
-            print(f"{format_size(dir_size, human_readable)}\t{root}")
+    def report(self, size, path):
+        """Print one size line."""
+        print(f"{format_size(size, self.human_readable)}\t{path}")
+
+    def scan(self, directory):
+        """
+        Read one directory.
+        
+        Returns the total size of its non-directory entries, a list of
+        (path, own size) for its subdirectories and a list of (path, size,
+        inode key) for other entries that need attention later: all of them
+        with -a, and any multiply linked file. The latter carry their
+        (st_dev, st_ino) key and are left out of the total, so that walk()
+        can count each inode once, in a deterministic order.
+        """
+        total = 0
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if self.exclude and (self.exclude.match(entry.name) or self.exclude.match(entry.path)):
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    size = self.size_of(st)
+                    if stat.S_ISDIR(st.st_mode):
+                        # -x: prune the whole subtree of another file system
+                        if self.one_file_system and st.st_dev != self.root_dev:
+                            continue
+                        subdirs.append((entry.path, size))
+                    elif st.st_nlink > 1 and not self.count_links:
+                        files.append((entry.path, size, (st.st_dev, st.st_ino)))
+                    else:
+                        total += size
+                        if self.all_files:
+                            files.append((entry.path, size, None))
+        except OSError as e:
+            print(f"du: cannot read directory '{directory}': {e.strerror}", file=sys.stderr)
+        return total, subdirs, files
+
+    def read_directory(self, directory):
+        """scan() a directory, or reuse its cached scan if it has not changed."""
+        if self.cache is None:
+            return self.scan(directory)
+        try:
+            st = os.lstat(directory)
+        except OSError:
+            return self.scan(directory)
+        result = self.cache.get(directory, st)
+        if result is None:
+            result = self.scan(directory)
+            self.cache.put(directory, st, result)
+        return result
+
+    def scan_parallel(self, path):
+        """
+        Scan every directory below path with a pool of self.jobs threads.
         
-        # Stop further recursion if max depth is reached
-        if max_depth is not None and root.count(os.sep) - path.count(os.sep) >= max_depth:
-            del dirs[:]
+        Each worker takes a directory from a shared queue, scans it and
+        queues its subdirectories, so high-latency directory reads overlap.
+        Returns a dict of read_directory() results by directory path, which walk()
+        then assembles in the same order as a serial run.
+        """
+        results = {}
+        pending = queue.Queue()
+
+        def worker():
+            while True:
+                directory = pending.get()
+                if directory is None:
+                    return
+                try:
+                    result = self.read_directory(directory)
+                except Exception as e:
+                    # walk() needs an entry for every queued directory
+                    print(f"du: cannot read directory '{directory}': {e}", file=sys.stderr)
+                    result = (0, [], [])
+                try:
+                    results[directory] = result
+                    for subdir, _ in result[1]:
+                        pending.put(subdir)
+                finally:
+                    pending.task_done()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.jobs)]
+        for thread in threads:
+            thread.start()
+        pending.put(path)
+        pending.join()
+        for thread in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+        return results
+
+    def walk(self, path):
+        """Report the usage of path and the directories below it; return its total."""
+        try:
+            st = os.lstat(path)
+        except OSError as e:
+            print(f"du: cannot access '{path}': {e.strerror}", file=sys.stderr)
+            return 0
+        if not stat.S_ISDIR(st.st_mode):
+            self.report(self.size_of(st), path)
+            return self.size_of(st)
+        self.root_dev = st.st_dev
 
-    return total_size
+        if self.jobs > 1:
+            scan = self.scan_parallel(path).pop
+        else:
+            scan = self.read_directory
+
+        def enter(directory, depth, own_size):
+            files_total, subdirs, files = scan(directory)
+            for file_path, size, key in files:
+                if key is not None:
+                    if key in self.seen:
+                        continue
+                    self.seen.add(key)
+                    files_total += size
+                if self.all_files and self.visible(depth + 1):
+                    self.report(size, file_path)
+            return [directory, depth, own_size + files_total, iter(subdirs)]
+
+        # Each frame: [path, depth, total so far, iterator over pending subdirectories]
+        stack = [enter(path, 0, self.size_of(st))]
+        while True:
+            frame = stack[-1]
+            child = next(frame[3], None)
+            if child is None:
+                # All subdirectories done: the total is final
+                stack.pop()
+                if self.visible(frame[1]):
+                    self.report(frame[2], frame[0])
+                if not stack:
+                    return frame[2]
+                stack[-1][2] += frame[2]
+                continue
+            child_path, child_size = child
+            stack.append(enter(child_path, frame[1] + 1, child_size))
+
+def du(path, all_files=False, human_readable=False, max_depth=None, apparent_size=False, jobs=1,
+       count_links=False, one_file_system=False, exclude=None, cache_file=None, verify=False):
+    """Calculate disk usage for the specified path, including all subdirectories."""
+    cache = None
+    if cache_file:
+        settings = json.dumps([all_files, apparent_size, count_links, one_file_system, exclude or []])
+        cache = ScanCache(cache_file, settings, verify)
+    engine = DiskUsage(all_files, human_readable, max_depth, apparent_size, jobs,
+                       count_links, one_file_system, exclude, cache)
+    total = engine.walk(path)
+    if cache is not None:
+        cache.save(path)
+    return total
 
 def main():
     parser = argparse.ArgumentParser(description="Python implementation of du command.")
@@ -55,13 +306,32 @@ def main():
     parser.add_argument("-a", "--all", action="store_true", help="Write counts for all files, not just directories")
     parser.add_argument("-H", "--human-readable", action="store_true", help="Print sizes in human readable format (e.g., 1K 234M 2G)")
     parser.add_argument("-d", "--max-depth", type=int, help="Print the total for a directory only if it is N or fewer levels below the command line argument")
+    parser.add_argument("--apparent-size", action="store_true", help="Print apparent sizes rather than disk usage")
+    parser.add_argument("-l", "--count-links", action="store_true", help="Count sizes many times if hard linked")
+    parser.add_argument("-x", "--one-file-system", action="store_true", help="Skip directories on different file systems")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help="Exclude files that match PATTERN")
+    parser.add_argument("-X", "--exclude-from", action="append", default=[], metavar="FILE", help="Exclude files that match any pattern in FILE")
+    parser.add_argument("--cache", metavar="FILE", help="Reuse scans of unchanged directories from FILE and update it")
+    parser.add_argument("--verify", action="store_true", help="With --cache, rescan every directory and refresh the cache")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Scan directories with N threads (for high-latency filesystems)")
 
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    exclude = list(args.exclude)
+    for exclude_file in args.exclude_from:
+        try:
+            exclude.extend(read_exclude_file(exclude_file))
+        except OSError as e:
+            parser.error(f"cannot read '{exclude_file}': {e.strerror}")
 
     # Execute disk usage calculation
-    total_size = du(args.path, all_files=args.all, human_readable=args.human_readable, max_depth=args.max_depth)
+    total_size = du(args.path, all_files=args.all, human_readable=args.human_readable, max_depth=args.max_depth,
+                    apparent_size=args.apparent_size, jobs=args.jobs, count_links=args.count_links,
+                    one_file_system=args.one_file_system, exclude=exclude, cache_file=args.cache,
+                    verify=args.verify)
     print(f"Total: {format_size(total_size, args.human_readable)}\t{args.path}")
 
 if __name__ == "__main__":
     main()
-
@@ -1,52 +1,1036 @@
 #!/usr/bin/env python3
 '''
-Name: Hamdy Abou El Anein 
+Name: Hamdy Abou El Anein
 Email: hamdy.aea@protonmail.com
 Date of creation:  6-11-2024
 Last update: 6-11-2024
 Version: 1.0
-Description: The find command from GNU coreutils in Python3  
-Example of use: python3 find.py -name "test" /path/to/search
+Description: The find command from GNU coreutils in Python3
+Example of use: python3 find.py /path/to/search -name "test"
 '''
 
 import os
+import re
 import sys
-import argparse
-
-def find(path, expression, follow_symlinks=False):
-    # On parcourt le répertoire
-    for root, dirs, files in os.walk(path, followlinks=follow_symlinks):
-        for name in files + dirs:
-            full_path = os.path.join(root, name)
-            # On applique l'expression de recherche (exemple avec -name)
-            if 'name' in expression:
-                pattern = expression['name']
-                if pattern in name:
-                    print(full_path)
-            # On pourrait ajouter d'autres expressions ici (comme -type)
+import stat
+import time
+import struct
+import fnmatch
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Relative cost of evaluating each kind of test, used to run cheap tests first
+COST_FREE = 0    # -true, -false
+COST_NAME = 1    # Only needs the name or path
+COST_TYPE = 2    # Usually answered by the directory entry, without stat()
+COST_STAT = 3    # Needs stat()
+
+# File type letters of -type, by stat.S_IFMT() value
+TYPE_LETTERS = {
+    stat.S_IFREG: 'f',
+    stat.S_IFDIR: 'd',
+    stat.S_IFLNK: 'l',
+    stat.S_IFBLK: 'b',
+    stat.S_IFCHR: 'c',
+    stat.S_IFIFO: 'p',
+    stat.S_IFSOCK: 's',
+}
+
+# -size units
+SIZE_UNITS = {'c': 1, 'w': 2, 'b': 512, 'k': 1024, 'M': 1024**2, 'G': 1024**3}
+
+# --build-index database: magic, then (root mtime_ns, build time, root length) and the root
+INDEX_MAGIC = b'PYFINDX1'
+INDEX_HEADER = struct.Struct('<qdH')
+
+# One index record, followed by the path bytes not shared with the previous record:
+# shared prefix length, suffix length, depth, type letter, size, mtime_ns
+INDEX_RECORD = struct.Struct('<HHHcQq')
+
+# Room left in ARG_MAX for the environment changing under us, as xargs does
+ARG_HEADROOM = 2048
+
+class FindError(Exception):
+    """Invalid command line expression."""
+
+class FileItem:
+    """
+    One file seen by the walk.
+
+    Wraps the os.scandir() DirEntry so that tests which only need the name
+    or the entry type never call stat(); stat() results are cached.
+    """
+    __slots__ = ('path', 'name', 'depth', 'entry', 'follow', 'dir_fd', 'pruned', 'out', '_stat')
+
+    def __init__(self, path, name, depth, entry=None, follow=False, dir_fd=None):
+        self.path = path
+        self.name = name
+        self.depth = depth
+        self.entry = entry
+        self.follow = follow
+        self.dir_fd = dir_fd  # Descriptor of the parent directory, None for starting points
+        self.pruned = False
+        self.out = None  # Output buffer of a parallel walk, None to print directly
+        self._stat = None
+
+    def stat(self):
+        """stat() the file once (lstat() unless following symlinks)."""
+        if self._stat is None:
+            try:
+                if self.entry is not None:
+                    self._stat = self.entry.stat(follow_symlinks=self.follow)
+                elif self.follow:
+                    self._stat = os.stat(self.path)
+                else:
+                    self._stat = os.lstat(self.path)
+            except OSError:
+                if not self.follow:
+                    raise
+                # Dangling symlink under -L: describe the link itself
+                self._stat = os.lstat(self.path)
+        return self._stat
+
+    def is_dir(self):
+        """Whether the walk should descend into this file."""
+        if self.entry is not None:
+            try:
+                return self.entry.is_dir(follow_symlinks=self.follow)
+            except OSError:
+                return False
+        try:
+            return stat.S_ISDIR(self.stat().st_mode)
+        except OSError:
+            return False
+
+    def file_type(self):
+        """The -type letter of the file, from the directory entry when possible."""
+        entry = self.entry
+        if entry is not None:
+            if not self.follow and entry.is_symlink():
+                return 'l'
+            if entry.is_dir(follow_symlinks=self.follow):
+                return 'd'
+            if entry.is_file(follow_symlinks=self.follow):
+                return 'f'
+        return TYPE_LETTERS.get(stat.S_IFMT(self.stat().st_mode), '?')
+
+class Node:
+    """A node of the compiled expression tree."""
+    cost = COST_FREE
+    pure = True  # No side effects, so it may be reordered
+
+    def evaluate(self, item):
+        raise NotImplementedError
+
+class TrueNode(Node):
+    def evaluate(self, item):
+        return True
+
+class FalseNode(Node):
+    def evaluate(self, item):
+        return False
+
+class NameNode(Node):
+    """-name, -iname, -path and -ipath, as a precompiled regex."""
+    cost = COST_NAME
+
+    def __init__(self, pattern, ignore_case=False, whole_path=False):
+        self.regex = re.compile(fnmatch.translate(pattern), re.IGNORECASE if ignore_case else 0)
+        self.whole_path = whole_path
+
+    def evaluate(self, item):
+        return self.regex.match(item.path if self.whole_path else item.name) is not None
+
+class TypeNode(Node):
+    cost = COST_TYPE
+
+    def __init__(self, letters):
+        self.letters = set(letters.split(','))
+        if not self.letters <= set(TYPE_LETTERS.values()):
+            raise FindError(f"Unknown argument to -type: {letters}")
+
+    def evaluate(self, item):
+        return item.file_type() in self.letters
+
+def parse_numeric(value, option):
+    """Split a +N, -N or N argument into a comparison sign and a number."""
+    sign = 0
+    if value[:1] == '+':
+        sign, value = 1, value[1:]
+    elif value[:1] == '-':
+        sign, value = -1, value[1:]
+    if not value.isdigit():
+        raise FindError(f"invalid argument '{value}' to {option}")
+    return sign, int(value)
+
+def compare(actual, sign, expected):
+    """Compare like find's numeric arguments: greater, less or exactly."""
+    if sign > 0:
+        return actual > expected
+    if sign < 0:
+        return actual < expected
+    return actual == expected
+
+class SizeNode(Node):
+    cost = COST_STAT
+
+    def __init__(self, value):
+        unit = SIZE_UNITS['b']
+        if value and value[-1] in SIZE_UNITS:
+            unit = SIZE_UNITS[value[-1]]
+            value = value[:-1]
+        self.unit = unit
+        self.sign, self.size = parse_numeric(value, '-size')
+
+    def evaluate(self, item):
+        # Sizes are rounded up to whole units
+        units = -(-item.stat().st_size // self.unit)
+        return compare(units, self.sign, self.size)
+
+class AgeNode(Node):
+    """-mtime (days) and -mmin (minutes), against the time find started."""
+    cost = COST_STAT
+
+    def __init__(self, value, option, period, now):
+        self.sign, self.age = parse_numeric(value, option)
+        self.period = period
+        self.now = now
+
+    def evaluate(self, item):
+        age = int((self.now - item.stat().st_mtime) // self.period)
+        return compare(age, self.sign, self.age)
+
+class NewerNode(Node):
+    cost = COST_STAT
+
+    def __init__(self, reference):
+        try:
+            self.mtime = os.stat(reference).st_mtime_ns
+        except OSError as e:
+            raise FindError(f"'{reference}': {e.strerror}")
+
+    def evaluate(self, item):
+        return item.stat().st_mtime_ns > self.mtime
+
+class PermNode(Node):
+    """-perm MODE (exactly), -perm -MODE (all bits) and -perm /MODE (any bit)."""
+    cost = COST_STAT
+
+    def __init__(self, value):
+        self.kind = value[:1] if value[:1] in '-/' else ''
+        digits = value[len(self.kind):]
+        try:
+            self.mode = int(digits, 8)
+        except ValueError:
+            raise FindError(f"invalid mode '{value}'")
+
+    def evaluate(self, item):
+        mode = stat.S_IMODE(item.stat().st_mode)
+        if self.kind == '-':
+            return mode & self.mode == self.mode
+        if self.kind == '/':
+            return self.mode == 0 or mode & self.mode != 0
+        return mode == self.mode
+
+class PruneNode(Node):
+    pure = False
+
+    def evaluate(self, item):
+        item.pruned = True
+        return True
+
+class PrintNode(Node):
+    pure = False
+
+    def evaluate(self, item):
+        if item.out is None:
+            print(item.path)
+        else:
+            item.out.append(item.path + '\n')
+        return True
+
+class Print0Node(Node):
+    pure = False
+
+    def evaluate(self, item):
+        if item.out is None:
+            sys.stdout.write(item.path + '\0')
+        else:
+            item.out.append(item.path + '\0')
+        return True
+
+class DeleteNode(Node):
+    """-delete, unlinking relative to the parent directory's descriptor."""
+    pure = False
+
+    def __init__(self):
+        self.failed = False
+
+    def evaluate(self, item):
+        if item.depth == 0 and item.path == '.':
+            # GNU find leaves the current directory alone, without an error
+            return True
+        try:
+            is_dir = item.file_type() == 'd' and not item.follow
+            remove = os.rmdir if is_dir else os.unlink
+            if item.dir_fd is None:
+                remove(item.path)
+            else:
+                remove(item.name, dir_fd=item.dir_fd)
+            return True
+        except OSError as e:
+            print(f"find: cannot delete '{item.path}': {e.strerror}", file=sys.stderr)
+            self.failed = True
+            return False
+
+    def finish(self):
+        """Returns False if anything could not be deleted."""
+        return not self.failed
+
+class ExecNode(Node):
+    """-exec COMMAND ;, run once per file with {} replaced by its path."""
+    pure = False
+
+    def __init__(self, command):
+        self.command = command
+        self.failed = False
+
+    def evaluate(self, item):
+        sys.stdout.flush()
+        argv = [arg.replace('{}', item.path) for arg in self.command]
+        try:
+            return subprocess.run(argv).returncode == 0
+        except OSError as e:
+            print(f"find: '{argv[0]}': {e.strerror}", file=sys.stderr)
+            return False
+
+    def finish(self):
+        """Run anything still pending; returns False if a command failed."""
+        return not self.failed
+
+def arg_max():
+    """Bytes available for the arguments of one command."""
+    try:
+        limit = os.sysconf('SC_ARG_MAX')
+    except (AttributeError, ValueError, OSError):
+        limit = 128 * 1024
+    environment = sum(len(key) + len(value) + 2 + 8 for key, value in os.environ.items())
+    return max(limit - environment - ARG_HEADROOM, 4096)
+
+class ExecBatchNode(ExecNode):
+    """
+    -exec COMMAND {} +, packing as many paths per command as ARG_MAX allows.
+
+    With -maxprocs N, up to N batches run at the same time.
+    """
+
+    def __init__(self, command, jobs=1):
+        super().__init__(command)
+        self.limit = arg_max()
+        self.base_size = sum(len(arg.encode()) + 1 + 8 for arg in command)
+        self.batch = []
+        self.batch_size = self.base_size
+        self.executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        self.running = []
+
+    def evaluate(self, item):
+        # Each argument costs its bytes, a terminating NUL and an argv pointer
+        size = len(os.fsencode(item.path)) + 1 + 8
+        if self.batch and self.batch_size + size > self.limit:
+            self.flush()
+        self.batch.append(item.path)
+        self.batch_size += size
+        return True
+
+    def run(self, argv):
+        try:
+            return subprocess.run(argv).returncode == 0
+        except OSError as e:
+            print(f"find: '{argv[0]}': {e.strerror}", file=sys.stderr)
+            return False
+
+    def flush(self):
+        """Start a command for the paths collected so far."""
+        argv = self.command + self.batch
+        self.batch = []
+        self.batch_size = self.base_size
+        sys.stdout.flush()
+        if self.executor is None:
+            if not self.run(argv):
+                self.failed = True
+        else:
+            self.running.append(self.executor.submit(self.run, argv))
+
+    def finish(self):
+        if self.batch:
+            self.flush()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            if not all(future.result() for future in self.running):
+                self.failed = True
+        return not self.failed
+
+class NotNode(Node):
+    def __init__(self, child):
+        self.child = child
+        self.cost = child.cost
+        self.pure = child.pure
+
+    def evaluate(self, item):
+        return not self.child.evaluate(item)
+
+class AndNode(Node):
+    def __init__(self, children):
+        self.children = reorder(children)
+        self.cost = max(child.cost for child in children)
+        self.pure = all(child.pure for child in children)
+
+    def evaluate(self, item):
+        for child in self.children:
+            if not child.evaluate(item):
+                return False
+        return True
+
+class OrNode(Node):
+    def __init__(self, children):
+        self.children = reorder(children)
+        self.cost = max(child.cost for child in children)
+        self.pure = all(child.pure for child in children)
+
+    def evaluate(self, item):
+        for child in self.children:
+            if child.evaluate(item):
+                return True
+        return False
+
+def reorder(children):
+    """
+    Sort each run of side-effect free operands by cost, so that cheap tests
+    can short-circuit before the ones needing stat(). Operands with side
+    effects (actions, -prune) keep their position.
+    """
+    result = []
+    run = []
+    for child in children:
+        if child.pure:
+            run.append(child)
+        else:
+            result.extend(sorted(run, key=lambda node: node.cost))
+            run = []
+            result.append(child)
+    result.extend(sorted(run, key=lambda node: node.cost))
+    return result
+
+class Parser:
+    """
+    Recursive descent parser compiling a GNU find expression into Nodes.
+
+    expr    := and ('-o' and)*
+    and     := unary (['-a'] unary)*
+    unary   := ('!' | '-not') unary | '(' expr ')' | primary
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.now = time.time()
+        self.max_depth = None
+        self.min_depth = 0
+        self.depth_first = False
+        self.exec_jobs = 1
+        self.has_action = False
+        self.actions = []
+        self.unindexed = []  # Options an --use-index search cannot answer
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def argument(self, option):
+        if self.pos >= len(self.tokens):
+            raise FindError(f"missing argument to '{option}'")
+        return self.next()
+
+    def parse(self):
+        """Compile the whole expression; adds -print when there is no action."""
+        # -maxprocs applies to every -exec ... +, wherever it appears
+        if '-maxprocs' in self.tokens:
+            index = self.tokens.index('-maxprocs')
+            value = self.tokens[index + 1] if index + 1 < len(self.tokens) else ''
+            if not value.isdigit() or int(value) < 1:
+                raise FindError(f"invalid argument '{value}' to -maxprocs")
+            self.exec_jobs = int(value)
+        if self.peek() is None:
+            node = TrueNode()
+        else:
+            node = self.parse_or()
+            if self.peek() is not None:
+                raise FindError(f"unexpected extra predicate '{self.peek()}'")
+        if not self.has_action:
+            node = AndNode([node, PrintNode()])
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() in ('-o', '-or'):
+            self.next()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else OrNode(children)
+
+    def parse_and(self):
+        children = [self.parse_unary()]
+        while self.peek() is not None and self.peek() not in ('-o', '-or', ')'):
+            if self.peek() in ('-a', '-and'):
+                self.next()
+            children.append(self.parse_unary())
+        return children[0] if len(children) == 1 else AndNode(children)
+
+    def parse_unary(self):
+        token = self.next()
+        if token is None:
+            raise FindError("expected an expression")
+        if token in ('!', '-not'):
+            return NotNode(self.parse_unary())
+        if token == '(':
+            node = self.parse_or()
+            if self.next() != ')':
+                raise FindError("invalid expression; I was expecting to find a ')' somewhere")
+            return node
+        return self.parse_primary(token)
+
+    def parse_primary(self, token):
+        if token in ('-name', '-iname'):
+            return NameNode(self.argument(token), ignore_case=token == '-iname')
+        if token in ('-path', '-ipath', '-wholename', '-iwholename'):
+            return NameNode(self.argument(token), ignore_case=token.startswith('-i'), whole_path=True)
+        if token == '-type':
+            return TypeNode(self.argument(token))
+        if token == '-size':
+            return SizeNode(self.argument(token))
+        if token == '-mtime':
+            return AgeNode(self.argument(token), token, 86400, self.now)
+        if token == '-mmin':
+            return AgeNode(self.argument(token), token, 60, self.now)
+        if token == '-newer':
+            return NewerNode(self.argument(token))
+        if token == '-perm':
+            # The index keeps no permission bits
+            self.unindexed.append(token)
+            return PermNode(self.argument(token))
+        if token == '-prune':
+            return PruneNode()
+        if token == '-true':
+            return TrueNode()
+        if token == '-false':
+            return FalseNode()
+        if token == '-print':
+            self.has_action = True
+            return PrintNode()
+        if token == '-print0':
+            self.has_action = True
+            return Print0Node()
+        if token == '-delete':
+            # Children must go before their directory
+            self.unindexed.append(token)
+            self.has_action = True
+            self.depth_first = True
+            node = DeleteNode()
+            self.actions.append(node)
+            return node
+        if token == '-exec':
+            return self.parse_exec(token)
+        if token == '-depth':
+            self.unindexed.append(token)
+            self.depth_first = True
+            return TrueNode()
+        if token == '-maxprocs':
+            self.argument(token)  # Handled by parse()
+            return TrueNode()
+        if token in ('-maxdepth', '-mindepth'):
+            value = self.argument(token)
+            if not value.isdigit():
+                raise FindError(f"Expected a positive decimal integer argument to {token}, but got '{value}'")
+            if token == '-maxdepth':
+                self.max_depth = int(value)
+            else:
+                self.min_depth = int(value)
+            return TrueNode()
+        if not token.startswith('-'):
+            # A starting point given after the expression
+            raise FindError(f"paths must precede expression: '{token}'")
+        raise FindError(f"unknown predicate '{token}'")
+
+    def parse_exec(self, option):
+        """Parse -exec COMMAND ; and -exec COMMAND {} +."""
+        command = []
+        while True:
+            token = self.next()
+            if token is None or (not command and token in (';', '+')):
+                raise FindError(f"missing argument to '{option}'")
+            if token == ';':
+                node = ExecNode(command)
+                break
+            if token == '+' and command[-1] == '{}':
+                node = ExecBatchNode(command[:-1], self.exec_jobs)
+                break
+            command.append(token)
+        self.has_action = True
+        self.actions.append(node)
+        return node
+
+def walk(path, follow_symlinks=False, max_depth=None, depth_first=False):
+    """
+    Walk the tree below path depth first, yielding a FileItem per file.
+
+    A directory is entered after it has been yielded, unless the consumer
+    set its pruned flag or max_depth is reached. With depth_first (-depth)
+    a directory is yielded after its contents instead.
+
+    Directories are read through a descriptor kept open while their entries
+    are processed, so entries can be stat()ed and removed relative to it.
+    """
+    flags = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+    if not follow_symlinks:
+        flags |= getattr(os, 'O_NOFOLLOW', 0)
+
+    def enter(item):
+        """Open a directory, returning a stack frame or None."""
+        try:
+            if item.dir_fd is None:
+                fd = os.open(item.path, flags)
+            else:
+                fd = os.open(item.name, flags, dir_fd=item.dir_fd)
+        except OSError as e:
+            print(f"find: '{item.path}': {e.strerror}", file=sys.stderr)
+            return None
+        try:
+            return (item, fd, os.scandir(fd))
+        except OSError as e:
+            os.close(fd)
+            print(f"find: '{item.path}': {e.strerror}", file=sys.stderr)
+            return None
+
+    def descend(item):
+        return (not item.pruned and (max_depth is None or item.depth < max_depth)
+                and item.is_dir())
+
+    root = FileItem(path, os.path.basename(path.rstrip(os.sep)) or path, 0, follow=follow_symlinks)
+    if not depth_first:
+        yield root
+    stack = []
+    if descend(root):
+        frame = enter(root)
+        if frame:
+            stack.append(frame)
+    if depth_first and not stack:
+        yield root
+
+    while stack:
+        parent, fd, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            entries.close()
+            os.close(fd)
+            stack.pop()
+            if depth_first:
+                yield parent
+            continue
+        item = FileItem(os.path.join(parent.path, entry.name), entry.name, parent.depth + 1,
+                        entry, follow_symlinks, fd)
+        if not depth_first:
+            yield item
+        frame = enter(item) if descend(item) else None
+        if frame:
+            stack.append(frame)
+        elif depth_first:
+            yield item
+
+class ParallelFind:
+    """
+    Walk and evaluate with a pool of threads, one directory per task (--jobs).
+
+    Each task reads a directory with os.scandir(), evaluates the expression
+    on its entries into an output buffer and submits its subdirectories as
+    new tasks, so directory reads and stat() calls overlap. A task returns
+    its output interleaved with the futures of its subdirectories, which
+    find() then follows to print in the same order as a serial walk. With
+    ordered=False each task prints its buffer as soon as it is done instead.
+    """
+
+    def __init__(self, expression, jobs, ordered=True, follow_symlinks=False,
+                 max_depth=None, min_depth=0):
+        self.expression = expression
+        self.ordered = ordered
+        self.follow_symlinks = follow_symlinks
+        self.max_depth = max_depth
+        self.min_depth = min_depth
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.output_lock = threading.Lock()
+        self.success = True
+
+    def evaluate(self, item, out):
+        if item.depth < self.min_depth:
+            return
+        item.out = out
+        try:
+            self.expression.evaluate(item)
+        except OSError as e:
+            print(f"find: '{item.path}': {e.strerror}", file=sys.stderr)
+            self.success = False
+
+    def descend(self, item):
+        return (not item.pruned and (self.max_depth is None or item.depth < self.max_depth)
+                and item.is_dir())
+
+    def scan(self, directory, depth):
+        """Task: evaluate the entries of one directory, returning its output segments."""
+        segments = []
+        out = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    item = FileItem(os.path.join(directory, entry.name), entry.name, depth,
+                                    entry, self.follow_symlinks)
+                    self.evaluate(item, out)
+                    if self.descend(item):
+                        if self.ordered:
+                            segments.append(''.join(out))
+                            out = []
+                        segments.append(self.executor.submit(self.scan, item.path, depth + 1))
+        except OSError as e:
+            print(f"find: '{directory}': {e.strerror}", file=sys.stderr)
+            self.success = False
+        if self.ordered:
+            segments.append(''.join(out))
+        elif out:
+            with self.output_lock:
+                sys.stdout.write(''.join(out))
+        return segments
+
+    def run(self, path):
+        """Process one starting point; returns False if anything failed."""
+        root = FileItem(path, os.path.basename(path.rstrip(os.sep)) or path, 0,
+                        follow=self.follow_symlinks)
+        out = []
+        self.evaluate(root, out)
+        sys.stdout.write(''.join(out))
+        if not self.descend(root):
+            return self.success
+
+        # Follow the tree of futures depth first, printing as results arrive
+        stack = [iter([self.executor.submit(self.scan, path, 1)])]
+        while stack:
+            segment = next(stack[-1], None)
+            if segment is None:
+                stack.pop()
+            elif isinstance(segment, str):
+                if segment:
+                    with self.output_lock:
+                        sys.stdout.write(segment)
+            else:
+                stack.append(iter(segment.result()))
+        return self.success
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+class IndexItem:
+    """
+    One file read back from a PathIndex, standing in for a FileItem.
+
+    The recorded type, size and mtime answer -type, -size, -mtime, -mmin
+    and -newer; the item is also its own stat() result for those fields.
+    """
+    __slots__ = ('path', 'name', 'depth', 'kind', 'st_size', 'st_mtime_ns',
+                 'follow', 'dir_fd', 'pruned', 'out')
+
+    def __init__(self, path, depth, kind, size, mtime_ns):
+        self.path = path
+        self.name = os.path.basename(path.rstrip(os.sep)) or path
+        self.depth = depth
+        self.kind = kind
+        self.st_size = size
+        self.st_mtime_ns = mtime_ns
+        self.follow = False
+        self.dir_fd = None
+        self.pruned = False
+        self.out = None
+
+    @property
+    def st_mtime(self):
+        return self.st_mtime_ns / 1e9
+
+    def stat(self):
+        return self
+
+    def is_dir(self):
+        return self.kind == 'd'
+
+    def file_type(self):
+        return self.kind
+
+def build_index(filename, root):
+    """
+    Write the --build-index database of every file below root.
+
+    Paths are front coded: each record only stores the bytes that differ
+    from the previous path, which in walk order share most of their
+    directory prefix. Returns the number of files recorded.
+    """
+    st = os.stat(root)
+    encoded_root = os.fsencode(root)
+    count = 0
+    previous = b''
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(INDEX_HEADER.pack(st.st_mtime_ns, time.time(), len(encoded_root)))
+        f.write(encoded_root)
+        for item in walk(root):
+            try:
+                kind = item.file_type()
+                item_stat = item.stat()
+            except OSError as e:
+                print(f"find: '{item.path}': {e.strerror}", file=sys.stderr)
+                continue
+            path = os.fsencode(item.path)
+            shared = 0
+            limit = min(len(path), len(previous), 0xFFFF)
+            while shared < limit and path[shared] == previous[shared]:
+                shared += 1
+            f.write(INDEX_RECORD.pack(shared, len(path) - shared, item.depth, kind.encode(),
+                                      item_stat.st_size, item_stat.st_mtime_ns))
+            f.write(path[shared:])
+            previous = path
+            count += 1
+    os.replace(temporary, filename)
+    return count
+
+class PathIndex:
+    """A database written by build_index(), searched by --use-index."""
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self.data = f.read()
+        if self.data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise FindError(f"'{filename}' is not a find.py index")
+        offset = len(INDEX_MAGIC)
+        self.root_mtime_ns, self.built, root_length = INDEX_HEADER.unpack_from(self.data, offset)
+        offset += INDEX_HEADER.size
+        self.root = os.fsdecode(self.data[offset:offset + root_length])
+        self.start = offset + root_length
+
+    def stale(self, max_age=None):
+        """
+        Whether the index no longer describes the tree: the root's mtime has
+        changed (an entry was added or removed at the top level) or, with
+        max_age, the index is more than max_age seconds old. Changes deeper
+        in the tree are only caught by max_age.
+        """
+        if max_age is not None and time.time() - self.built > max_age:
+            return True
+        try:
+            return os.stat(self.root).st_mtime_ns != self.root_mtime_ns
+        except OSError:
+            return True
+
+    def covers(self, path):
+        path = path.rstrip(os.sep) or path
+        return path == self.root or path.startswith(os.path.join(self.root, ''))
+
+    def items(self, path, max_depth=None):
+        """Yield an IndexItem per recorded file at or below path, in walk order."""
+        data = self.data
+        unpack = INDEX_RECORD.unpack_from
+        record_size = INDEX_RECORD.size
+        offset = self.start
+        end = len(data)
+        previous = b''
+        # Match 'dir/' as 'dir', but print paths spelled as given, like walk()
+        key = path.rstrip(os.sep) or path
+        prefix = os.fsencode(key)
+        below = os.fsencode(os.path.join(key, ''))
+        respell = os.fsencode(os.path.join(path, '')) if key != path else None
+        base_depth = None
+        skip = None  # Path prefix of a pruned directory
+        while offset < end:
+            shared, length, depth, kind, size, mtime_ns = unpack(data, offset)
+            offset += record_size
+            current = previous[:shared] + data[offset:offset + length]
+            offset += length
+            previous = current
+            if base_depth is None:
+                if current != prefix:
+                    continue
+                base_depth = depth
+            elif not current.startswith(below):
+                if depth <= base_depth:
+                    return
+                continue
+            if skip is not None:
+                if current.startswith(skip):
+                    continue
+                skip = None
+            depth -= base_depth
+            if max_depth is not None and depth > max_depth:
+                continue
+            shown = current
+            if respell is not None:
+                shown = os.fsencode(path) if depth == 0 else respell + current[len(below):]
+            item = IndexItem(os.fsdecode(shown), depth, kind.decode(), size, mtime_ns)
+            yield item
+            if item.pruned and kind == b'd':
+                skip = current + b'/'
+
+def find(paths, expression, follow_symlinks=False, max_depth=None, min_depth=0,
+         depth_first=False, actions=(), jobs=1, ordered=True, index=None):
+    """
+    Evaluate the compiled expression on every file below paths.
+
+    jobs > 1 walks with ParallelFind, except with -depth or the -delete and
+    -exec actions, whose effects must happen one at a time and in order.
+    Paths covered by index (a PathIndex) are read from it instead.
+    """
+    success = True
+    parallel = None
+    if jobs > 1 and not depth_first and not actions:
+        parallel = ParallelFind(expression, jobs, ordered, follow_symlinks, max_depth, min_depth)
+    for path in paths:
+        if not os.path.lexists(path):
+            print(f"find: '{path}': No such file or directory", file=sys.stderr)
+            success = False
+            continue
+        if parallel is not None and (index is None or not index.covers(path)):
+            if not parallel.run(path):
+                success = False
+            continue
+        if index is not None and index.covers(path):
+            items = index.items(path, max_depth)
+        else:
+            items = walk(path, follow_symlinks, max_depth, depth_first)
+        for item in items:
+            if item.depth < min_depth:
+                continue
+            try:
+                expression.evaluate(item)
+            except OSError as e:
+                print(f"find: '{item.path}': {e.strerror}", file=sys.stderr)
+                success = False
+
+    if parallel is not None:
+        parallel.close()
+
+    # Run the last -exec ... + batches and collect the actions' exit status
+    for node in actions:
+        if not node.finish():
+            success = False
+    sys.stdout.flush()
+    return success
+
+def usage():
+    print("Usage: find.py [-H] [-L] [-P] [-j N|--jobs=N] [--unordered] [path...] [expression]")
+    print("Tests:   -name/-iname/-path/-ipath PATTERN, -type [fdlbcps], -size [+-]N[cwbkMG],")
+    print("         -mtime [+-]N, -mmin [+-]N, -newer FILE, -perm [-/]MODE, -true, -false")
+    print("Options: -maxdepth N, -mindepth N, -depth, -maxprocs N (parallel -exec ... + batches)")
+    print("Actions: -print, -print0, -prune, -delete, -exec COMMAND ;, -exec COMMAND {} +")
+    print("Operators: ( EXPR ), ! EXPR, -not EXPR, EXPR -a EXPR, EXPR -o EXPR")
+    print("--jobs=N walks with N threads; output keeps the serial order unless --unordered")
+    print("--build-index DB ROOT records the tree below ROOT; --use-index DB searches it instead")
+    print("  (-type, -size, -mtime, -mmin, -newer and names); --index-max-age SECONDS")
 
 def main():
-    parser = argparse.ArgumentParser(description="GNU find command simplified")
-    parser.add_argument("path", nargs="?", default=".", help="Répertoire à partir duquel la recherche commence")
-    parser.add_argument("-name", help="Recherche par nom de fichier")
-    parser.add_argument("-type", help="Recherche par type (fichier, répertoire, etc.)")
-    parser.add_argument("-L", action="store_true", help="Suivre les liens symboliques")
-    parser.add_argument("-P", action="store_true", help="Ne pas suivre les liens symboliques (comportement par défaut)")
-    
-    args = parser.parse_args()
-    
-    expression = {}
-    if args.name:
-        expression['name'] = args.name
-    if args.type:
-        expression['type'] = args.type  # À ajouter si on veut gérer les types de fichiers
-
-    follow_symlinks = args.L  # Priorité à -L s'il est donné
-    if args.P:
-        follow_symlinks = False
-
-    find(args.path, expression, follow_symlinks)
+    args = sys.argv[1:]
+    if args[:1] in (['-h'], ['--help']):
+        usage()
+        return
+
+    # Symlink and walker options come first
+    follow_symlinks = False
+    jobs = 1
+    ordered = True
+    index_file = None
+    index_max_age = None
+    while args:
+        if args[0] in ('-H', '-L', '-P'):
+            follow_symlinks = args.pop(0) == '-L'
+        elif args[0] == '--unordered':
+            ordered = False
+            args.pop(0)
+        elif args[0] == '--build-index':
+            if len(args) != 3:
+                print("find: usage: --build-index DB ROOT", file=sys.stderr)
+                sys.exit(1)
+            try:
+                build_index(args[1], args[2])
+            except OSError as e:
+                print(f"find: '{e.filename}': {e.strerror}", file=sys.stderr)
+                sys.exit(1)
+            return
+        elif args[0] in ('--use-index', '--index-max-age') or args[0].startswith(
+                ('--use-index=', '--index-max-age=')):
+            option, _, value = args.pop(0).partition('=')
+            if not value:
+                value = args.pop(0) if args else ''
+            if option == '--use-index':
+                index_file = value
+            else:
+                try:
+                    index_max_age = float(value)
+                except ValueError:
+                    print(f"find: invalid index age '{value}'", file=sys.stderr)
+                    sys.exit(1)
+        elif args[0] in ('-j', '--jobs') or args[0].startswith(('-j', '--jobs=')):
+            option = args.pop(0)
+            if option in ('-j', '--jobs'):
+                value = args.pop(0) if args else ''
+            else:
+                value = option[len('--jobs='):] if option.startswith('--') else option[2:]
+            if not value.isdigit() or int(value) < 1:
+                print(f"find: invalid number of jobs '{value}'", file=sys.stderr)
+                sys.exit(1)
+            jobs = int(value)
+        else:
+            break
+
+    # Then the starting points, up to the first expression token
+    paths = []
+    while args and not (args[0].startswith('-') or args[0] in ('(', '!')):
+        paths.append(args.pop(0))
+
+    index = None
+    try:
+        parser = Parser(args)
+        expression = parser.parse()
+        if index_file:
+            index = PathIndex(index_file)
+    except FindError as e:
+        print(f"find: {e}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"find: '{index_file}': {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    if not paths:
+        paths = [index.root if index is not None else '.']
+
+    # Fall back to the file system when the index cannot give the right answer
+    if index is not None and (parser.unindexed or follow_symlinks):
+        reason = ', '.join(parser.unindexed) or '-L'
+        print(f"find: {reason} cannot be answered from the index, searching the file system",
+              file=sys.stderr)
+        index = None
+    elif index is not None and index.stale(index_max_age):
+        print(f"find: index '{index_file}' of '{index.root}' is stale, searching the file system",
+              file=sys.stderr)
+        index = None
+
+    success = find(paths, expression, follow_symlinks, parser.max_depth, parser.min_depth,
+                   parser.depth_first, parser.actions, jobs, ordered, index)
+    sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
     main()
-
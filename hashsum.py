@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+'''
+Name: Hamdy Abou El Anein
+Email: hamdy.aea@protonmail.com
+Date of creation:  19-10-2026
+Last update: 19-10-2026
+Version: 1.0
+Description: Hashing engine shared by md5sum, sha1sum, sha224sum, sha256sum, sha384sum, sha512sum, b2sum and cksum
+Example of use: from hashsum import hash_file; hash_file("file.txt", "sha256").hexdigest()
+'''
+
+import re
+import sys
+import zlib
+import hashlib
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+# Read size for files hashed with readinto(); large enough that hashlib,
+# not the Python loop, sets the speed
+BUFFER_SIZE = 1024 * 1024
+
+# Results computed ahead of the one being printed, per --jobs thread
+QUEUE_DEPTH = 4
+
+# Checksum file lines: BSD "ALGO (name) = digest" (--tag) and GNU "digest  name"
+# or "digest *name"; a leading backslash marks an escaped name
+BSD_LINE = re.compile(r'(\\)?([A-Za-z0-9]+?)(?:-(\d+))? \((.*)\) = ([0-9A-Fa-f]+)')
+GNU_LINE = re.compile(r'(\\)?([0-9A-Fa-f]+) ([ *])(.*)')
+
+# Name of each algorithm in BSD lines
+TAGS = {
+    'md5': 'MD5',
+    'sha1': 'SHA1',
+    'sha224': 'SHA224',
+    'sha256': 'SHA256',
+    'sha384': 'SHA384',
+    'sha512': 'SHA512',
+    'blake2b': 'BLAKE2b',
+    'crc32': 'CRC32',
+}
+
+# Options of --check mode, as keyword arguments of check_manifests()
+CHECK_OPTIONS = {
+    '--quiet': 'quiet',
+    '--status': 'status',
+    '-w': 'warn',
+    '--warn': 'warn',
+    '--ignore-missing': 'ignore_missing',
+    '--strict': 'strict',
+}
+
+# One reusable read buffer per thread
+_buffers = threading.local()
+
+class Crc32:
+    """zlib CRC-32 with the update()/digest()/hexdigest() interface of hashlib."""
+    name = 'crc32'
+    digest_size = 4
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def digest(self):
+        return self.value.to_bytes(4, 'big')
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+def new_hash(algorithm, digest_size=None):
+    """
+    Create a hash object for algorithm.
+
+    Args:
+        algorithm (str): hashlib name (md5, sha256, blake2b...) or crc32
+        digest_size (int): Digest length in bytes, for blake2b/blake2s
+
+    Returns:
+        object: Hash object with update(), digest() and hexdigest()
+    """
+    if algorithm == 'crc32':
+        return Crc32()
+    if digest_size and algorithm in ('blake2b', 'blake2s'):
+        return hashlib.new(algorithm, digest_size=digest_size)
+    return hashlib.new(algorithm)
+
+def _buffer():
+    buffer = getattr(_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _buffers.buffer = bytearray(BUFFER_SIZE)
+    return buffer
+
+def hash_stream(stream, hasher):
+    """
+    Feed everything readable from a binary stream to hasher.
+
+    Reads with readinto() into the thread's reused buffer and hashes
+    through a memoryview, so no bytes object is created per read.
+    """
+    buffer = _buffer()
+    view = memoryview(buffer)
+    readinto = stream.readinto
+    update = hasher.update
+    while True:
+        size = readinto(buffer)
+        if not size:
+            break
+        update(view[:size] if size < BUFFER_SIZE else view)
+    return hasher
+
+def hash_file(path, algorithm='md5', digest_size=None):
+    """
+    Hash one file, or standard input for '-'.
+
+    Every file is read with hash_stream(); hashlib releases the GIL on
+    updates of that size. Files are not mapped with mmap: a file truncated
+    by another process while it is hashed would kill the process with
+    SIGBUS. Raises OSError if the file cannot be read.
+
+    Args:
+        path (str): File to hash
+        algorithm (str): Algorithm name, see new_hash()
+        digest_size (int): Digest length in bytes, for blake2b/blake2s
+
+    Returns:
+        object: The updated hash object
+    """
+    hasher = new_hash(algorithm, digest_size)
+    if str(path) == '-':
+        return hash_stream(sys.stdin.buffer, hasher)
+    with open(path, 'rb', buffering=0) as f:
+        return hash_stream(f, hasher)
+
+def ordered_map(function, items, jobs=1):
+    """
+    Yield function(item) for each item, in order, computing up to jobs at once.
+
+    Results that finish early wait in a bounded buffer until everything
+    before them has been yielded, so output keeps the argument order while
+    at most jobs * QUEUE_DEPTH items are in flight. Large update() calls and
+    reads release the GIL, so files hash in parallel.
+
+    Args:
+        function (callable): Called with one item, in a worker thread
+        items (iterable): Items, usually file names
+        jobs (int): Number of threads; 1 runs everything in the caller
+
+    Yields:
+        object: function(item); an exception it raised is re-raised here
+    """
+    if jobs <= 1:
+        for item in items:
+            yield function(item)
+        return
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= jobs * QUEUE_DEPTH:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def unescape(name):
+    """Undo the backslash escapes of a name on a line starting with a backslash."""
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), name)
+
+def escape(name):
+    """Spell a name containing a newline the way GNU tools print it."""
+    if '\n' not in name:
+        return name
+    return '\\' + name.replace('\\', '\\\\').replace('\n', '\\n')
+
+def parse_checksum_line(line, algorithm=None, digest_size=None):
+    """
+    Parse one line of a checksum file, in GNU or BSD (--tag) format.
+
+    Args:
+        line (str): Line without its newline
+        algorithm (str): Algorithm of the calling tool; None accepts any
+            algorithm named by a BSD line (cksum)
+        digest_size (int): Expected digest size in bytes (b2sum -l), if any
+
+    Returns:
+        tuple: (file name, algorithm, digest size, hex digest), or None if
+        the line is not a properly formatted checksum line
+    """
+    line = line.rstrip('\r')
+    match = BSD_LINE.fullmatch(line)
+    if match:
+        escaped, tag, bits, name, digest = match.groups()
+        line_algorithm = next((key for key, value in TAGS.items() if value == tag), None)
+        if line_algorithm is None or (algorithm is not None and line_algorithm != algorithm):
+            return None
+        size = int(bits) // 8 if bits else None
+    else:
+        match = GNU_LINE.fullmatch(line)
+        if not match or algorithm is None:
+            return None
+        escaped, digest, _, name = match.groups()
+        line_algorithm = algorithm
+        size = digest_size
+
+    # BLAKE2b digests may be shortened; everything else has a fixed size
+    if line_algorithm == 'blake2b':
+        if size is None:
+            size = len(digest) // 2
+        if not 1 <= size <= 64:
+            return None
+    else:
+        size = None
+    try:
+        expected = new_hash(line_algorithm, size).digest_size * 2
+    except ValueError:
+        return None
+    if len(digest) != expected or not name:
+        return None
+    if escaped:
+        name = unescape(name)
+    return name, line_algorithm, size, digest.lower()
+
+def read_manifest(manifest):
+    """Yield the lines of a checksum file ('-' for standard input) as they are read."""
+    if manifest == '-':
+        for line in sys.stdin:
+            yield line.rstrip('\n')
+        return
+    with open(manifest, errors='surrogateescape') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+def verify_entry(entry):
+    """
+    Hash the file of one parsed line.
+
+    Returns:
+        tuple: (entry, True or False for a match, None) or (entry, None, OSError)
+    """
+    name, algorithm, size, digest = entry
+    try:
+        return entry, hash_file(name, algorithm, size).hexdigest() == digest, None
+    except OSError as e:
+        return entry, None, e
+
+def plural(count, singular, plural_form):
+    return f"{count} {singular if count == 1 else plural_form}"
+
+def check_manifests(manifests, program, algorithm=None, digest_size=None, jobs=1,
+                    quiet=False, status=False, warn=False, ignore_missing=False, strict=False):
+    """
+    Verify checksum files the way GNU md5sum -c does.
+
+    Lines are parsed as they are read and their files hashed by a pool of
+    jobs threads (see ordered_map()), while results are printed in file
+    order. A warning summary follows each checksum file.
+
+    Args:
+        manifests (list): Checksum files, '-' for standard input
+        program (str): Name used in messages, e.g. 'md5sum'
+        algorithm (str): Algorithm of the tool, None to take it from BSD lines
+        digest_size (int): Expected digest size in bytes (b2sum -l), if any
+        jobs (int): Files hashed at a time
+        quiet (bool): Do not print OK lines
+        status (bool): Print nothing on standard output; only the exit status tells
+        warn (bool): Warn about each improperly formatted line
+        ignore_missing (bool): Do not fail or report for missing files
+        strict (bool): Fail if any line is improperly formatted
+
+    Returns:
+        bool: True if every listed file was verified successfully
+    """
+    success = True
+    label = TAGS.get(algorithm, algorithm.upper()) if algorithm else 'checksum'
+    for manifest in manifests:
+        bad_lines = 0
+        unreadable = 0
+        mismatched = 0
+        verified = 0
+        entries = 0
+
+        def parsed():
+            # Parse lazily so verification starts before the file is fully read
+            nonlocal bad_lines, entries
+            for number, line in enumerate(read_manifest(manifest), 1):
+                entry = parse_checksum_line(line, algorithm, digest_size)
+                if entry is None:
+                    bad_lines += 1
+                    if warn and not status:
+                        print(f"{program}: {manifest}: {number}: improperly formatted {label} "
+                              "checksum line", file=sys.stderr)
+                    continue
+                entries += 1
+                yield entry
+
+        try:
+            for entry, matched, error in ordered_map(verify_entry, parsed(), jobs):
+                name = entry[0]
+                shown = escape(name)
+                if error is not None:
+                    if ignore_missing and isinstance(error, FileNotFoundError):
+                        continue
+                    unreadable += 1
+                    print(f"{program}: {name}: {error.strerror}", file=sys.stderr)
+                    if not status:
+                        print(f"{shown}: FAILED open or read")
+                    continue
+                verified += 1
+                if not matched:
+                    mismatched += 1
+                    if not status:
+                        print(f"{shown}: FAILED")
+                elif not quiet and not status:
+                    print(f"{shown}: OK")
+        except OSError as e:
+            print(f"{program}: {manifest}: {e.strerror}", file=sys.stderr)
+            success = False
+            continue
+
+        if entries == 0:
+            print(f"{program}: {manifest}: no properly formatted checksum lines found",
+                  file=sys.stderr)
+            success = False
+            continue
+        if not status:
+            if bad_lines:
+                print(f"{program}: WARNING: {plural(bad_lines, 'line is', 'lines are')} "
+                      "improperly formatted", file=sys.stderr)
+            if unreadable:
+                print(f"{program}: WARNING: {plural(unreadable, 'listed file', 'listed files')} "
+                      "could not be read", file=sys.stderr)
+            if mismatched:
+                print(f"{program}: WARNING: "
+                      f"{plural(mismatched, 'computed checksum', 'computed checksums')} "
+                      "did NOT match", file=sys.stderr)
+        if ignore_missing and verified == 0:
+            print(f"{program}: {manifest}: no file was verified", file=sys.stderr)
+            success = False
+        if unreadable or mismatched or (strict and bad_lines):
+            success = False
+    sys.stdout.flush()
+    return success
+
+def check_option_defaults():
+    """Return the check_manifests() keyword arguments, all off."""
+    return dict.fromkeys(CHECK_OPTIONS.values(), False)
+
+def jobs_argument(arg, args, program):
+    """
+    Parse -j N, -jN, --jobs N or --jobs=N for the hand written option loops.
+
+    Args:
+        arg (str): Current command line argument
+        args (iterator): Remaining arguments, to take a separate N from
+        program (str): Name used in the error message
+
+    Returns:
+        int: Number of jobs, or None if arg is not a jobs option
+    """
+    if arg in ('-j', '--jobs'):
+        value = next(args, '')
+    elif arg.startswith('--jobs='):
+        value = arg[len('--jobs='):]
+    elif arg.startswith('-j') and not arg.startswith('--'):
+        value = arg[2:]
+    else:
+        return None
+    if not value.isdigit() or int(value) < 1:
+        print(f"{program}: invalid number of jobs: '{value}'", file=sys.stderr)
+        sys.exit(1)
+    return int(value)
+
+def main(program, algorithm, compute):
+    """
+    Command line of the sha224sum, sha256sum, sha384sum and sha512sum tools.
+
+    Args:
+        program (str): Tool name, for messages
+        algorithm (str): Algorithm used by -c
+        compute (callable): Returns the output line for one file
+    """
+    jobs = 1
+    check = False
+    check_options = check_option_defaults()
+    files = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in ('-c', '--check'):
+            check = True
+        elif arg in CHECK_OPTIONS:
+            check_options[CHECK_OPTIONS[arg]] = True
+        elif (value := jobs_argument(arg, args, program)) is not None:
+            jobs = value
+        else:
+            files.append(arg)
+
+    if check:
+        if not check_manifests(files or ['-'], program, algorithm, jobs=jobs, **check_options):
+            sys.exit(1)
+        return
+
+    if not files:
+        print(f"Usage: ./{program}.py [-j N|--jobs=N] <file1> [file2 ...]", file=sys.stderr)
+        print(f"       ./{program}.py -c [--quiet] [--status] [-w] [--ignore-missing] [--strict] "
+              "[-j N] [checksum file ...]", file=sys.stderr)
+        sys.exit(1)
+
+    # Hash jobs files at a time, printing in argument order
+    for line in ordered_map(compute, files, jobs):
+        print(line)
@@ -8,26 +8,21 @@ Version: 1.0
 Description: The md5sum command from coreutils in Python3  
 Example of use: python3 md5sum.py file.txt
 '''
-import hashlib
 import sys
 import os
 
+from hashsum import (CHECK_OPTIONS, check_manifests, check_option_defaults, hash_file,
+                     jobs_argument, ordered_map)
+
 def compute_md5(file_path, binary_mode=False):
     """Calculer la somme de contrôle MD5 d'un fichier"""
-    hash_md5 = hashlib.md5()
-    mode = 'rb' if binary_mode else 'r'
-
-    with open(file_path, mode) as f:
-        while chunk := f.read(4096):
-            if not binary_mode:
-                chunk = chunk.encode()
-            hash_md5.update(chunk)
-
-    return hash_md5.hexdigest()
+    # Text and binary modes read the same bytes on POSIX: only the '*' marker differs
+    return hash_file(file_path, 'md5').hexdigest()
 
-def print_md5sum(file_path, binary_mode=False, bsd_tag=False, zero_terminated=False):
+def print_md5sum(file_path, binary_mode=False, bsd_tag=False, zero_terminated=False, md5_hash=None):
     """Imprime la somme MD5 du fichier avec les options spécifiées"""
-    md5_hash = compute_md5(file_path, binary_mode)
+    if md5_hash is None:
+        md5_hash = compute_md5(file_path, binary_mode)
     separator = "\0" if zero_terminated else "\n"
     mode_char = '*' if binary_mode else ' '
     if bsd_tag:
@@ -35,28 +30,19 @@ def print_md5sum(file_path, binary_mode=False, bsd_tag=False, zero_terminated=Fa
     else:
         print(f"{md5_hash} {mode_char}{file_path}", end=separator)
 
-def check_md5sum(file_path, quiet=False, strict=False):
-    """Vérifie la somme de contrôle d'un fichier avec les valeurs stockées"""
-    with open(file_path, "r") as f:
-        for line in f:
-            expected_hash, file_name = line.strip().split("  ")
-            computed_hash = compute_md5(file_name, binary_mode=True)
-
-            if computed_hash == expected_hash:
-                if not quiet:
-                    print(f"{file_name}: OK")
-            else:
-                if strict:
-                    sys.exit(1)
-                print(f"{file_name}: FAILED")
+def check_md5sum(file_paths, quiet=False, strict=False, status=False, warn=False,
+                 ignore_missing=False, jobs=1):
+    """Vérifie les sommes de contrôle listées (formats GNU et BSD), renvoie True si tout est bon"""
+    return check_manifests(file_paths, "md5sum", "md5", jobs=jobs, quiet=quiet, status=status,
+                           warn=warn, ignore_missing=ignore_missing, strict=strict)
 
 def main():
     binary_mode = False
     check_mode = False
     bsd_tag = False
     zero_terminated = False
-    quiet = False
-    strict = False
+    check_options = check_option_defaults()
+    jobs = 1
 
     files = []
 
@@ -71,12 +57,19 @@ def main():
             bsd_tag = True
         elif arg in ("-z", "--zero"):
             zero_terminated = True
-        elif arg == "--quiet":
-            quiet = True
-        elif arg == "--strict":
-            strict = True
+        elif arg in CHECK_OPTIONS:
+            check_options[CHECK_OPTIONS[arg]] = True
+        elif (value := jobs_argument(arg, args, "md5sum")) is not None:
+            jobs = value
         elif arg == "--help":
-            print("Usage: md5sum [OPTION]... [FILE]...\nCompute and check MD5 checksums.")
+            print("Usage: md5sum [OPTION]... [FILE]...\nCompute and check MD5 checksums.\n"
+                  "  -c, --check       read checksums from the FILEs and check them\n"
+                  "      --quiet       don't print OK for each successfully verified file\n"
+                  "      --status      don't output anything, status code shows success\n"
+                  "  -w, --warn        warn about improperly formatted checksum lines\n"
+                  "      --strict      exit non-zero for improperly formatted checksum lines\n"
+                  "      --ignore-missing  don't fail or report status for missing files\n"
+                  "  -j, --jobs=N      hash N files at a time")
             return
         elif arg == "--version":
             print("md5sum 1.0")
@@ -85,12 +78,15 @@ def main():
             files.append(arg)
 
     if check_mode:
-        for file_path in files:
-            check_md5sum(file_path, quiet, strict)
+        if not check_md5sum(files or ["-"], jobs=jobs, **check_options):
+            sys.exit(1)
     else:
-        for file_path in files:
-            if os.path.isfile(file_path):
-                print_md5sum(file_path, binary_mode, bsd_tag, zero_terminated)
+        def compute(file_path):
+            return compute_md5(file_path, binary_mode) if os.path.isfile(file_path) else None
+
+        for file_path, md5_hash in zip(files, ordered_map(compute, files, jobs)):
+            if md5_hash is not None:
+                print_md5sum(file_path, binary_mode, bsd_tag, zero_terminated, md5_hash)
             else:
                 print(f"Error: File not found - {file_path}")
                 sys.exit(1)
@@ -9,10 +9,78 @@ Description:  The od command from GNU coreutils in Python3.
 Example of use: python od.py file.txt
 '''
 
+import io
+import os
+import re
 import sys
 import argparse
-import binascii
-import string
+
+# Output lines formatted per read; input is consumed in blocks of width * ROWS_PER_BLOCK bytes
+ROWS_PER_BLOCK = 4096
+
+# Per-byte lookup tables, so a row is formatted with a single join
+OCTAL_TABLE = tuple(f"{b:03o}" for b in range(256))
+DECIMAL_TABLE = tuple(f"{b}" for b in range(256))
+CHAR_TABLE = tuple(chr(b) if 32 <= b < 127 else '.' for b in range(256))
+
+# One type in a -t argument: a letter optionally followed by a size
+TYPE_PATTERN = re.compile(r'([doux])(\d+|[CSIL])?|(f)(\d+|[FDL])?|(c)')
+
+# Named sizes for integer and floating point types
+INT_SIZES = {'C': 1, 'S': 2, 'I': 4, 'L': 8}
+FLOAT_SIZES = {'F': 4, 'D': 8, 'L': 8}
+
+# struct/memoryview codes used to decode each type in bulk
+INT_CODES = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+FLOAT_CODES = {4: 'f', 8: 'd'}
+
+# Field widths for the wider types, wide enough for the largest value
+FIELD_WIDTHS = {
+    'd': {1: 4, 2: 6, 4: 11, 8: 20},
+    'u': {1: 3, 2: 5, 4: 10, 8: 20},
+    'o': {1: 3, 2: 6, 4: 11, 8: 22},
+    'x': {1: 2, 2: 4, 4: 8, 8: 16},
+}
+FLOAT_FORMATS = {4: '>14.7e', 8: '>23.16e'}
+
+# -A radix: offset format and the width used to indent extra -t lines
+ADDRESS_FORMATS = {'o': '07o', 'd': '07d', 'x': '06x', 'n': None}
+
+def parse_types(value):
+    """
+    Split a -t argument such as 'x2' or 'x1u2' into (letter, size) pairs.
+    
+    A bare o, x or d keeps the original single-byte layout (size None).
+    
+    Args:
+        value (str): The -t argument
+    
+    Returns:
+        list: (letter, size) tuples
+    """
+    types = []
+    pos = 0
+    while pos < len(value):
+        match = TYPE_PATTERN.match(value, pos)
+        if not match:
+            raise argparse.ArgumentTypeError(f"invalid type string '{value}'")
+        int_type, int_size, float_type, float_size, char_type = match.groups()
+        if char_type:
+            types.append(('c', None))
+        elif int_type:
+            size = INT_SIZES.get(int_size) or (int(int_size) if int_size else None)
+            if size is None and int_type == 'u':
+                size = 1
+            if size is not None and size not in INT_CODES:
+                raise argparse.ArgumentTypeError(f"invalid type string '{value}'")
+            types.append((int_type, size))
+        else:
+            size = FLOAT_SIZES.get(float_size) or (int(float_size) if float_size else 8)
+            if size not in FLOAT_CODES:
+                raise argparse.ArgumentTypeError(f"invalid type string '{value}'")
+            types.append(('f', size))
+        pos = match.end()
+    return types
 
 class OctalDumper:
     def __init__(self, options):
@@ -23,154 +91,217 @@ class OctalDumper:
             options (Namespace): Parsed command-line arguments
         """
         self.options = options
-    
-    def format_output(self, data):
+        types = [t for spec in (options.format or [[('o', None)]]) for t in spec]
+        self.formatters = [self._compile_format(letter, size) for letter, size in types]
+        self.address_format = ADDRESS_FORMATS[options.address_radix]
+        self.indent = ' ' * len(self._address(0))
+        self.previous_row = None
+        self.suppressed = False
+
+    def _address(self, offset):
         """
-        Format input data based on specified output type.
+        Format an input offset in the -A radix.
         
         Args:
-            data (bytes): Input data to dump
+            offset (int): Input offset
         
         Returns:
-            list: Formatted output lines
+            str: Formatted offset, empty for -A n
         """
-        if self.options.format == 'o':
-            return self._format_octal(data)
-        elif self.options.format == 'x':
-            return self._format_hex(data)
-        elif self.options.format == 'c':
-            return self._format_char(data)
-        elif self.options.format == 'd':
-            return self._format_decimal(data)
-        else:
-            return self._format_octal(data)
-    
-    def _format_octal(self, data):
+        if self.address_format is None:
+            return ''
+        return format(offset, self.address_format)
+
+    def _compile_format(self, letter, size):
         """
-        Format data in octal representation.
+        Build the row formatter for one -t type.
         
         Args:
-            data (bytes): Input data
+            letter (str): Type letter (d, o, u, x, f or c)
+            size (int): Bytes per value, None for the original byte layout
         
         Returns:
-            list: Formatted octal output lines
+            callable: Function formatting one row of bytes
         """
-        output = []
-        offset = 0
+        if letter == 'c':
+            return self._format_char
+        if size is None or (size == 1 and letter in 'ox'):
+            return {'o': self._format_octal,
+                    'x': self._format_hex,
+                    'd': self._format_decimal}[letter]
         
-        while offset < len(data):
-            # Get chunk of data
-            chunk = data[offset:offset+self.options.width]
-            
-            # Format offset
-            offset_str = f"{offset:07o}"
-            
-            # Format bytes
-            byte_str = ' '.join(f"{b:03o}" for b in chunk)
-            
-            # Pad byte string if needed
-            byte_str = byte_str.ljust(3 * self.options.width)
-            
-            output.append(f"{offset_str} {byte_str}")
-            offset += self.options.width
+        if letter == 'f':
+            code = FLOAT_CODES[size]
+            field = '{:' + FLOAT_FORMATS[size] + '}'
+        else:
+            code = INT_CODES[size] if letter == 'd' else INT_CODES[size].upper()
+            width = FIELD_WIDTHS[letter][size]
+            if letter in 'ox':
+                field = '{:0' + str(width) + letter + '}'
+            else:
+                field = '{:>' + str(width) + 'd}'
+        format_value = field.format
         
-        return output
+        def format_values(chunk):
+            # Zero-pad a trailing partial value, then decode the row in bulk
+            extra = len(chunk) % size
+            if extra:
+                chunk = bytes(chunk) + bytes(size - extra)
+            return ' '.join(map(format_value, memoryview(chunk).cast(code)))
+        return format_values
     
-    def _format_hex(self, data):
+    def format_output(self, data, offset=0):
         """
-        Format data in hexadecimal representation.
+        Format input data based on specified output type.
         
         Args:
-            data (bytes): Input data
+            data (bytes): Input data to dump
+            offset (int): Input offset of the first byte of data
         
         Returns:
-            list: Formatted hex output lines
+            list: Formatted output lines
         """
+        width = self.options.width
+        verbose = self.options.output_duplicates
         output = []
-        offset = 0
-        
-        while offset < len(data):
-            # Get chunk of data
-            chunk = data[offset:offset+self.options.width]
-            
-            # Format offset
-            offset_str = f"{offset:07o}"
+        for start in range(0, len(data), width):
+            chunk = data[start:start + width]
             
-            # Format bytes
-            byte_str = ' '.join(f"{b:02x}" for b in chunk)
+            # Replace repeats of the previous full row with a single '*'
+            if not verbose and len(chunk) == width:
+                if chunk == self.previous_row:
+                    if not self.suppressed:
+                        output.append('*')
+                        self.suppressed = True
+                    continue
+                self.previous_row = bytes(chunk)
+                self.suppressed = False
             
-            # Pad byte string if needed
-            byte_str = byte_str.ljust(3 * self.options.width)
+            address = self._address(offset + start)
+            for i, format_row in enumerate(self.formatters):
+                output.append(f"{address if i == 0 else self.indent} {format_row(chunk)}")
+        return output
+
+    def dump(self, file, out):
+        """
+        Stream one input file to out, one block of rows at a time.
+        
+        Args:
+            file (BinaryIO): Input file
+            out (BinaryIO): Buffered binary output stream
+        """
+        width = self.options.width
+        block_size = width * ROWS_PER_BLOCK
+        offset = self._skip(file, self.options.skip_bytes)
+        self.previous_row = None
+        self.suppressed = False
+        remaining = self.options.read_bytes
+        pending = b''
+        
+        while remaining is None or remaining > 0:
+            size = block_size if remaining is None else min(block_size, remaining)
+            data = file.read(size)
+            if not data:
+                break
+            if remaining is not None:
+                remaining -= len(data)
             
-            output.append(f"{offset_str} {byte_str}")
-            offset += self.options.width
+            # Keep a partial row (short read on a pipe) for the next block
+            data = pending + data
+            usable = len(data) - len(data) % width
+            pending = data[usable:]
+            if usable:
+                lines = self.format_output(memoryview(data)[:usable], offset)
+                out.write(('\n'.join(lines) + '\n').encode())
+                offset += usable
         
-        return output
+        if pending:
+            out.write(('\n'.join(self.format_output(pending, offset)) + '\n').encode())
+            offset += len(pending)
+        
+        # Final offset, so the input length is known even after a '*'
+        if self.address_format is not None:
+            out.write((self._address(offset) + '\n').encode())
+
+    def _skip(self, file, skip):
+        """
+        Skip the first bytes of the input, seeking when possible.
+        
+        Args:
+            file (BinaryIO): Input file
+            skip (int): Number of bytes to skip
+        
+        Returns:
+            int: Offset of the next byte to read
+        """
+        if not skip:
+            return 0
+        try:
+            if file.seekable():
+                file.seek(skip, os.SEEK_CUR)
+                return skip
+        except (AttributeError, OSError):
+            pass
+        
+        # Not seekable (pipe, terminal): read and discard
+        left = skip
+        while left > 0:
+            data = file.read(min(left, 1024 * 1024))
+            if not data:
+                break
+            left -= len(data)
+        return skip - left
     
-    def _format_char(self, data):
+    def _format_octal(self, chunk):
         """
-        Format data in character representation.
+        Format a row of data in octal representation.
         
         Args:
-            data (bytes): Input data
+            chunk (bytes): Row data
         
         Returns:
-            list: Formatted character output lines
+            str: Formatted octal bytes
         """
-        output = []
-        offset = 0
+        byte_str = ' '.join(map(OCTAL_TABLE.__getitem__, chunk))
+        return byte_str.ljust(3 * self.options.width)
+    
+    def _format_hex(self, chunk):
+        """
+        Format a row of data in hexadecimal representation.
         
-        while offset < len(data):
-            # Get chunk of data
-            chunk = data[offset:offset+self.options.width]
-            
-            # Format offset
-            offset_str = f"{offset:07o}"
-            
-            # Format characters
-            char_str = []
-            for b in chunk:
-                if b in range(32, 127):
-                    char_str.append(chr(b))
-                else:
-                    char_str.append('.')
-            
-            char_output = ''.join(char_str)
-            output.append(f"{offset_str} {char_output}")
-            offset += self.options.width
+        Args:
+            chunk (bytes): Row data
         
-        return output
+        Returns:
+            str: Formatted hex bytes
+        """
+        byte_str = chunk.hex(' ')
+        return byte_str.ljust(3 * self.options.width)
     
-    def _format_decimal(self, data):
+    def _format_char(self, chunk):
         """
-        Format data in decimal representation.
+        Format a row of data in character representation.
         
         Args:
-            data (bytes): Input data
+            chunk (bytes): Row data
         
         Returns:
-            list: Formatted decimal output lines
+            str: Formatted characters
         """
-        output = []
-        offset = 0
+        return ''.join(map(CHAR_TABLE.__getitem__, chunk))
+    
+    def _format_decimal(self, chunk):
+        """
+        Format a row of data in decimal representation.
         
-        while offset < len(data):
-            # Get chunk of data
-            chunk = data[offset:offset+self.options.width]
-            
-            # Format offset
-            offset_str = f"{offset:07o}"
-            
-            # Format bytes
-            byte_str = ' '.join(f"{b}" for b in chunk)
-            
-            # Pad byte string if needed
-            byte_str = byte_str.ljust(3 * self.options.width)
-            
-            output.append(f"{offset_str} {byte_str}")
-            offset += self.options.width
+        Args:
+            chunk (bytes): Row data
         
-        return output
+        Returns:
+            str: Formatted decimal bytes
+        """
+        byte_str = ' '.join(map(DECIMAL_TABLE.__getitem__, chunk))
+        return byte_str.ljust(3 * self.options.width)
 
 def main():
     """
@@ -179,16 +310,33 @@ def main():
     parser = argparse.ArgumentParser(description='Dump files in octal and other formats')
     
     # Format options
-    parser.add_argument('-t', dest='format', 
-                        choices=['o', 'x', 'c', 'd'], 
-                        default='o', 
-                        help='Output format: o (octal), x (hex), c (char), d (decimal)')
+    parser.add_argument('-t', '--format', dest='format',
+                        action='append', type=parse_types,
+                        help='Output format, may be repeated: o, x, d, u with an optional '
+                             'size 1, 2, 4, 8 (or C, S, I, L), f4/f8 (or F, D), c (char)')
+    
+    # Offset radix
+    parser.add_argument('-A', '--address-radix', choices=['d', 'o', 'x', 'n'],
+                        default='o',
+                        help='Output offsets in decimal, octal, hex or not at all')
+    
+    # Duplicate suppression
+    parser.add_argument('-v', '--output-duplicates', action='store_true',
+                        help="Do not use '*' to mark line suppression")
     
     # Width options
     parser.add_argument('-w', '--width', type=int, 
                         default=16, 
                         help='Bytes per output line')
     
+    # Input range
+    parser.add_argument('-j', '--skip-bytes', type=int,
+                        default=0,
+                        help='Skip BYTES input bytes first')
+    parser.add_argument('-N', '--read-bytes', type=int,
+                        default=None,
+                        help='Limit dump to BYTES input bytes')
+    
     # Input source
     parser.add_argument('files', nargs='*', 
                         type=argparse.FileType('rb'), 
@@ -199,17 +347,14 @@ def main():
     
     # Create dumper
     dumper = OctalDumper(args)
+    out = io.BufferedWriter(io.FileIO(sys.stdout.fileno(), 'wb', closefd=False),
+                            buffer_size=1024 * 1024)
     
     # Process input files
     try:
         for file in args.files:
-            # Read entire file
-            data = file.read()
-            
-            # Format and print output
-            output_lines = dumper.format_output(data)
-            for line in output_lines:
-                print(line)
+            dumper.dump(file, out)
+        out.flush()
     
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
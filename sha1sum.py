@@ -12,9 +12,10 @@ Example of use:  python sha1sum.py file1.txt
 
 import sys
 import argparse
-import hashlib
 from pathlib import Path
 
+from hashsum import check_manifests, hash_file, ordered_map
+
 def calculate_sha1(file_path, binary_output=False):
     """
     Calculate SHA1 hash for a given file.
@@ -27,12 +28,7 @@ def calculate_sha1(file_path, binary_output=False):
         tuple: (hash_value, error_message)
     """
     try:
-        sha1_hash = hashlib.sha1()
-        
-        with open(file_path, 'rb') as file:
-            # Read in chunks for memory efficiency
-            for chunk in iter(lambda: file.read(4096), b''):
-                sha1_hash.update(chunk)
+        sha1_hash = hash_file(file_path, 'sha1')
         
         # Return hash in requested format
         return (sha1_hash.digest() if binary_output 
@@ -53,27 +49,51 @@ def main():
     parser.add_argument('-b', '--binary', 
                         action='store_true', 
                         help='Print binary digest')
-    parser.add_argument('--check', 
+    parser.add_argument('-c', '--check', 
                         action='store_true', 
                         help='Read checksums and verify')
     parser.add_argument('-q', '--quiet', 
                         action='store_true', 
-                        help='Suppress OK/FAILED output')
+                        help='Do not print OK for verified files')
+    parser.add_argument('--status', 
+                        action='store_true', 
+                        help='Print nothing when checking; the exit status shows success')
+    parser.add_argument('-w', '--warn', 
+                        action='store_true', 
+                        help='Warn about improperly formatted checksum lines')
+    parser.add_argument('--strict', 
+                        action='store_true', 
+                        help='Fail on improperly formatted checksum lines')
+    parser.add_argument('--ignore-missing', 
+                        action='store_true', 
+                        help='Do not fail or report for missing files')
+    parser.add_argument('-j', '--jobs', 
+                        type=int, default=1, 
+                        help='Hash N files at a time')
     
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
     
     # Verify mode
     if args.check:
-        check_files(args.files, args.quiet)
+        if not check_files(args.files, args.quiet, args.status, args.warn,
+                           args.ignore_missing, args.strict, args.jobs):
+            sys.exit(1)
         return
     
-    # Hash calculation mode
-    for file_path in args.files:
+    def compute(file_path):
         if not file_path.exists():
+            return None
+        return calculate_sha1(file_path, args.binary)
+    
+    # Hash calculation mode, in parallel but printed in argument order
+    for file_path, result in zip(args.files, ordered_map(compute, args.files, args.jobs)):
+        if result is None:
             print(f"{file_path}: No such file", file=sys.stderr)
             continue
         
-        hash_value, error = calculate_sha1(file_path, args.binary)
+        hash_value, error = result
         
         if error:
             print(f"Error processing {file_path}: {error}", file=sys.stderr)
@@ -82,49 +102,26 @@ def main():
         else:
             print(f"{hash_value}  {file_path}")
 
-def check_files(checksum_files, quiet=False):
+def check_files(checksum_files, quiet=False, status=False, warn=False,
+                ignore_missing=False, strict=False, jobs=1):
     """
-    Verify checksums from files.
+    Verify checksums from files, in GNU or BSD (--tag) format.
     
     Args:
         checksum_files (list): List of files containing checksums
-        quiet (bool): Suppress detailed output
+        quiet (bool): Do not print OK lines
+        status (bool): Print nothing, only return the result
+        warn (bool): Warn about improperly formatted lines
+        ignore_missing (bool): Skip listed files that do not exist
+        strict (bool): Fail on improperly formatted lines
+        jobs (int): Number of files verified at a time
+    
+    Returns:
+        bool: True if every listed file matched
     """
-    for checksum_file in checksum_files:
-        try:
-            with open(checksum_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    try:
-                        # Parse standard checksum file format
-                        stored_hash, filename = line.split('  ', 1)
-                        file_path = Path(filename)
-                        
-                        # Skip non-existent files
-                        if not file_path.exists():
-                            if not quiet:
-                                print(f"{filename}: FAILED open")
-                            continue
-                        
-                        # Calculate current hash
-                        current_hash, error = calculate_sha1(file_path)
-                        
-                        # Compare hashes
-                        if error:
-                            if not quiet:
-                                print(f"{filename}: FAILED (error: {error})")
-                        elif current_hash == stored_hash:
-                            if not quiet:
-                                print(f"{filename}: OK")
-                        else:
-                            if not quiet:
-                                print(f"{filename}: FAILED")
-                    
-                    except ValueError:
-                        print(f"Invalid line format in {checksum_file}")
-        
-        except Exception as e:
-            print(f"Error reading {checksum_file}: {e}", file=sys.stderr)
+    return check_manifests([str(path) for path in checksum_files], 'sha1sum', 'sha1',
+                           jobs=jobs, quiet=quiet, status=status, warn=warn,
+                           ignore_missing=ignore_missing, strict=strict)
 
 if __name__ == '__main__':
     main()
@@ -10,7 +10,9 @@ Example of use: python3 sha224sum.py file.txt
 '''
 
 import sys
-import hashlib
+
+import hashsum
+from hashsum import hash_file
 
 def compute_sha224sum(filename):
     """
@@ -22,12 +24,8 @@ def compute_sha224sum(filename):
     Returns:
         str: SHA-224 hash in hexadecimal format
     """
-    sha224_hash = hashlib.sha224()
-    
     try:
-        with open(filename, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha224_hash.update(chunk)
+        sha224_hash = hash_file(filename, 'sha224')
         
         return f"{sha224_hash.hexdigest()}  {filename}"
     
@@ -39,12 +37,7 @@ def compute_sha224sum(filename):
         sys.exit(1)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: ./sha224sum.py <file1> [file2 ...]", file=sys.stderr)
-        sys.exit(1)
-    
-    for filename in sys.argv[1:]:
-        print(compute_sha224sum(filename))
+    hashsum.main("sha224sum", "sha224", compute_sha224sum)
 
 if __name__ == "__main__":
     main()
@@ -10,7 +10,9 @@ Example of use: python3 sha256sum.py file.txt
 '''
 
 import sys
-import hashlib
+
+import hashsum
+from hashsum import hash_file
 
 def compute_sha256sum(filename):
     """
@@ -22,12 +24,8 @@ def compute_sha256sum(filename):
     Returns:
         str: SHA-256 hash in hexadecimal format
     """
-    sha256_hash = hashlib.sha256()
-    
     try:
-        with open(filename, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha256_hash.update(chunk)
+        sha256_hash = hash_file(filename, 'sha256')
         
         return f"{sha256_hash.hexdigest()}  {filename}"
     
@@ -39,12 +37,7 @@ def compute_sha256sum(filename):
         sys.exit(1)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: ./sha256sum.py <file1> [file2 ...]", file=sys.stderr)
-        sys.exit(1)
-    
-    for filename in sys.argv[1:]:
-        print(compute_sha256sum(filename))
+    hashsum.main("sha256sum", "sha256", compute_sha256sum)
 
 if __name__ == "__main__":
     main()
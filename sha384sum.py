@@ -10,7 +10,9 @@ Example of use: python3 sha384sum.py file.txt
 '''
 
 import sys
-import hashlib
+
+import hashsum
+from hashsum import hash_file
 
 def compute_sha384sum(filename):
     """
@@ -22,12 +24,8 @@ def compute_sha384sum(filename):
     Returns:
         str: SHA-384 hash in hexadecimal format
     """
-    sha384_hash = hashlib.sha384()
-    
     try:
-        with open(filename, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha384_hash.update(chunk)
+        sha384_hash = hash_file(filename, 'sha384')
         
         return f"{sha384_hash.hexdigest()}  {filename}"
     
@@ -39,12 +37,7 @@ def compute_sha384sum(filename):
         sys.exit(1)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: ./sha384sum.py <file1> [file2 ...]", file=sys.stderr)
-        sys.exit(1)
-    
-    for filename in sys.argv[1:]:
-        print(compute_sha384sum(filename))
+    hashsum.main("sha384sum", "sha384", compute_sha384sum)
 
 if __name__ == "__main__":
     main()
@@ -10,7 +10,9 @@ Example of use: python3 sha512sum.py file.txt
 '''
 
 import sys
-import hashlib
+
+import hashsum
+from hashsum import hash_file
 
 def compute_sha512sum(filename):
     """
@@ -22,12 +24,8 @@ def compute_sha512sum(filename):
     Returns:
         str: SHA-512 hash in hexadecimal format
     """
-    sha512_hash = hashlib.sha512()
-    
     try:
-        with open(filename, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha512_hash.update(chunk)
+        sha512_hash = hash_file(filename, 'sha512')
         
         return f"{sha512_hash.hexdigest()}  {filename}"
     
@@ -39,12 +37,7 @@ def compute_sha512sum(filename):
         sys.exit(1)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: ./sha512sum.py <file1> [file2 ...]", file=sys.stderr)
-        sys.exit(1)
-    
-    for filename in sys.argv[1:]:
-        print(compute_sha512sum(filename))
+    hashsum.main("sha512sum", "sha512", compute_sha512sum)
 
 if __name__ == "__main__":
     main()
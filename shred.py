@@ -11,14 +11,59 @@ Example of use: python3 shred.py file.txt
 
 import os
 import sys
+import mmap
+import errno
+import fcntl
+import time
 import random
+import hashlib
+import itertools
+import threading
 import argparse
 import stat
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Bytes written per pwrite() call: page aligned, and a whole number of 3-byte patterns
+CHUNK_SIZE = 3 * 256 * 1024
+
+# Transfer lengths must be a multiple of this for O_DIRECT
+DIRECT_ALIGN = 512
+
+# ioctl returning the size of a block device in bytes (linux/fs.h)
+BLKGETSIZE64 = 0x80081272
+
+# GNU shred's fixed overwrite patterns, as 3-byte repeating units
+PATTERNS = [
+    b'\x00\x00\x00', b'\xff\xff\xff', b'\x55\x55\x55', b'\xaa\xaa\xaa',
+    b'\x24\x92\x49', b'\x49\x24\x92', b'\x92\x49\x24',
+    b'\x6d\xb6\xdb', b'\xb6\xdb\x6d', b'\xdb\x6d\xb6',
+] + [bytes([0x11 * i] * 3) for i in range(1, 15)]
+
+class RandomStream:
+    """Bulk random data: the kernel CSPRNG, or a SHAKE-256 counter-mode stream keyed from a file."""
+    
+    def __init__(self, source=None):
+        self.key = None
+        self.counter = itertools.count()  # next() is atomic, so threads never share a block
+        if source:
+            with open(source, 'rb') as f:
+                self.key = f.read(64)
+            if len(self.key) < 16:
+                raise OSError(f"{source}: end of file")
+    
+    def read(self, size):
+        """Return size random bytes."""
+        if self.key is None:
+            return os.urandom(size)
+        block = hashlib.shake_256(self.key + next(self.counter).to_bytes(8, 'little'))
+        return block.digest(size)
+
 class FileShredder:
     def __init__(self, passes=3, zeros=True, remove=True, force=False, 
-                 exact=False, verbose=False, size=None):
+                 exact=False, verbose=False, size=None, random_source=None,
+                 direct=False, sync=False):
         self.passes = passes
         self.zeros = zeros
         self.remove = remove
@@ -27,10 +72,100 @@ class FileShredder:
         self.verbose = verbose
         self.size = size
         self.random = random.SystemRandom()  # Cryptographically secure RNG
+        self.random_stream = RandomStream(random_source)
+        self.direct = direct
+        self.sync = sync
+        self.output_lock = threading.Lock()
         
     def _get_random_bytes(self, size):
         """Generate cryptographically secure random bytes."""
-        return bytes(self.random.randint(0, 255) for _ in range(size))
+        return self.random_stream.read(size)
+    
+    def _pass_plan(self):
+        """
+        Choose the pattern for each overwrite pass, None meaning random data.
+        
+        Like GNU shred, up to 3 passes are all random; longer runs use random
+        data for the first, last and every fourth pass and fill the rest with
+        the fixed patterns in shuffled order.
+        """
+        if self.passes <= 3:
+            return [None] * self.passes
+        patterns = PATTERNS[:]
+        self.random.shuffle(patterns)
+        plan = []
+        fixed = 0
+        for pass_num in range(self.passes):
+            if pass_num == 0 or pass_num == self.passes - 1 or pass_num % 4 == 0:
+                plan.append(None)
+            else:
+                plan.append(patterns[fixed % len(patterns)])
+                fixed += 1
+        return plan
+    
+    def _open_for_overwrite(self, path, follow_symlinks=True):
+        """Open path for in-place writing, without truncating it."""
+        flags = os.O_WRONLY
+        if not follow_symlinks:
+            # A file found by -r that was replaced by a symlink meanwhile
+            flags |= os.O_NOFOLLOW
+        if self.sync:
+            flags |= os.O_SYNC
+        if self.direct and hasattr(os, 'O_DIRECT'):
+            try:
+                return os.open(path, flags | os.O_DIRECT)
+            except OSError as e:
+                # Filesystems such as tmpfs refuse O_DIRECT
+                if e.errno != errno.EINVAL:
+                    raise
+        return os.open(path, flags)
+    
+    def _write_pass(self, fd, size, pattern, buffer):
+        """
+        Overwrite the first size bytes of fd in place with one pass.
+        
+        buffer is a page aligned CHUNK_SIZE staging buffer, so the writes
+        also work on a descriptor opened with O_DIRECT.
+        """
+        view = memoryview(buffer)
+        if pattern is not None:
+            buffer[:] = pattern * (CHUNK_SIZE // 3)
+        offset = 0
+        while offset < size:
+            write_size = min(size - offset, CHUNK_SIZE)
+            if pattern is None:
+                buffer[:write_size] = self._get_random_bytes(write_size)
+            direct_flags = None
+            if write_size % DIRECT_ALIGN and hasattr(os, 'O_DIRECT'):
+                # The unaligned tail cannot be written with O_DIRECT: clear it
+                # for this write only, later passes reuse the descriptor
+                flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+                if flags & os.O_DIRECT:
+                    direct_flags = flags
+                    fcntl.fcntl(fd, fcntl.F_SETFL, flags & ~os.O_DIRECT)
+            try:
+                done = 0
+                while done < write_size:
+                    done += os.pwrite(fd, view[done:write_size], offset + done)
+            finally:
+                if direct_flags is not None:
+                    fcntl.fcntl(fd, fcntl.F_SETFL, direct_flags)
+            offset += write_size
+        os.fsync(fd)
+        
+    def _report(self, message):
+        """Print a message on stderr, one whole line at a time across threads."""
+        with self.output_lock:
+            print(message, file=sys.stderr)
+    
+    def _timed_pass(self, path, fd, size, pattern, buffer):
+        """Run one pass, reporting its throughput in verbose mode."""
+        start = time.monotonic()
+        self._write_pass(fd, size, pattern, buffer)
+        if self.verbose:
+            elapsed = max(time.monotonic() - start, 0.000001)
+            self._report(f"shred: '{path}': {format_bytes(size)} in {elapsed:.2f}s, "
+                         f"{format_bytes(size / elapsed)}/s")
         
     def _make_file_writable(self, path):
         """Make file writable if necessary."""
@@ -48,6 +183,9 @@ class FileShredder:
             if self.size is not None:
                 return self.size
             
+            if stat.S_ISBLK(os.stat(path).st_mode):
+                return self._get_device_size(path)
+            
             if self.exact:
                 # Use actual file size for exact mode
                 return os.path.getsize(path)
@@ -59,6 +197,18 @@ class FileShredder:
         except OSError:
             return 0
             
+    def _get_device_size(self, path):
+        """Get the size of a block device from the kernel."""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            try:
+                result = fcntl.ioctl(fd, BLKGETSIZE64, b'\0' * 8)
+                return int.from_bytes(result, sys.byteorder)
+            except OSError:
+                return os.lseek(fd, 0, os.SEEK_END)
+        finally:
+            os.close(fd)
+            
     def _secure_remove(self, path):
         """Securely remove the file using various techniques."""
         try:
@@ -79,8 +229,7 @@ class FileShredder:
                 path = random_path
             except OSError:
                 if self.verbose:
-                    print(f"shred: warning: could not rename '{path}'", 
-                          file=sys.stderr)
+                    self._report(f"shred: warning: could not rename '{path}'")
             
             # Remove the file
             os.unlink(path)
@@ -88,77 +237,144 @@ class FileShredder:
             
         except OSError as e:
             if self.verbose:
-                print(f"shred: error removing '{path}': {str(e)}", 
-                      file=sys.stderr)
+                self._report(f"shred: error removing '{path}': {str(e)}")
             return False
             
-    def shred_file(self, path):
-        """Shred a single file."""
+    def shred_file(self, path, follow_symlinks=True):
+        """
+        Shred a single file.
+        
+        Files found by the -r walk pass follow_symlinks=False, so a symlink
+        swapped in for them is refused rather than its target overwritten.
+        """
         if not self.force and not os.path.exists(path):
-            print(f"shred: '{path}': No such file or directory", 
-                  file=sys.stderr)
+            self._report(f"shred: '{path}': No such file or directory")
             return False
             
         # Check if file is writable or make it writable
         if not os.access(path, os.W_OK):
             if not self.force or not self._make_file_writable(path):
-                print(f"shred: '{path}': Permission denied", file=sys.stderr)
+                self._report(f"shred: '{path}': Permission denied")
                 return False
                 
         size = self._get_file_size(path)
         if size == 0:
             if self.verbose:
-                print(f"shred: '{path}': file empty or error reading", 
-                      file=sys.stderr)
+                self._report(f"shred: '{path}': file empty or error reading")
             return False
             
         try:
-            # Perform overwrite passes
-            for pass_num in range(self.passes):
-                if self.verbose:
-                    print(f"shred: '{path}': pass {pass_num+1}/{self.passes}", 
-                          file=sys.stderr)
-                    
-                with open(path, 'wb') as f:
-                    # Write in chunks to handle large files
-                    chunk_size = min(size, 1024 * 1024)  # 1MB chunks
-                    remaining = size
-                    
-                    while remaining > 0:
-                        write_size = min(remaining, chunk_size)
-                        f.write(self._get_random_bytes(write_size))
-                        remaining -= write_size
-                        
-                    # Ensure data is written to disk
-                    f.flush()
-                    os.fsync(f.fileno())
-                    
-            # Final pass with zeros if requested
-            if self.zeros:
-                if self.verbose:
-                    print(f"shred: '{path}': final zero pass", file=sys.stderr)
+            # Overwrite the existing blocks in place: truncating would let the
+            # filesystem hand out new blocks and leave the old data behind
+            fd = self._open_for_overwrite(path, follow_symlinks)
+            buffer = mmap.mmap(-1, CHUNK_SIZE)
+            try:
+                # Perform overwrite passes
+                for pass_num, pattern in enumerate(self._pass_plan()):
+                    if self.verbose:
+                        name = 'random' if pattern is None else pattern.hex()
+                        self._report(f"shred: '{path}': pass {pass_num+1}/{self.passes} ({name})")
+                    self._timed_pass(path, fd, size, pattern, buffer)
                     
-                with open(path, 'wb') as f:
-                    remaining = size
-                    while remaining > 0:
-                        write_size = min(remaining, chunk_size)
-                        f.write(b'\0' * write_size)
-                        remaining -= write_size
-                    f.flush()
-                    os.fsync(f.fileno())
+                # Final pass with zeros if requested
+                if self.zeros:
+                    if self.verbose:
+                        self._report(f"shred: '{path}': final zero pass")
+                    self._timed_pass(path, fd, size, PATTERNS[0], buffer)
+            finally:
+                buffer.close()
+                os.close(fd)
                     
             # Remove file if requested
             if self.remove:
                 if self.verbose:
-                    print(f"shred: '{path}': removing", file=sys.stderr)
+                    self._report(f"shred: '{path}': removing")
                 self._secure_remove(path)
                 
             return True
             
         except OSError as e:
-            print(f"shred: error writing '{path}': {str(e)}", file=sys.stderr)
+            self._report(f"shred: error writing '{path}': {str(e)}")
             return False
 
+def format_bytes(size):
+    """Format a byte count with a binary unit suffix."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
+
+def walk_files(path):
+    """
+    Yield the regular files below directory path.
+    
+    Symlinks are skipped, never followed: shredding one would overwrite
+    its target, which may be outside the tree.
+    """
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path
+        except OSError as e:
+            print(f"shred: cannot read directory '{directory}': {e.strerror}", 
+                  file=sys.stderr)
+
+def expand_paths(paths, recursive):
+    """
+    Expand directory operands into the files they contain (-r).
+    
+    Yields (path, follow_symlinks): operands named on the command line are
+    followed like GNU shred does, files found by the walk are not.
+    """
+    for path in paths:
+        if recursive and os.path.isdir(path) and not os.path.islink(path):
+            for file_path in walk_files(path):
+                yield file_path, False
+        else:
+            yield path, True
+
+def shred_files(shredder, paths, jobs=1):
+    """
+    Shred (path, follow_symlinks) pairs, running up to jobs files concurrently.
+    
+    Files are grouped by device so that each disk gets its share of the
+    workers and every worker writes one file at a time in inode order,
+    rather than all workers seeking across the same disk.
+    """
+    if jobs <= 1:
+        results = [shredder.shred_file(path, follow) for path, follow in paths]
+        return all(results)
+    
+    devices = defaultdict(list)
+    for path, follow in paths:
+        try:
+            st = os.stat(path) if follow else os.lstat(path)
+            devices[st.st_dev].append((st.st_ino, path, follow))
+        except OSError:
+            # Let shred_file report the error
+            devices[None].append((0, path, follow))
+    
+    def shred_group(group):
+        return all([shredder.shred_file(path, follow) for _, path, follow in group])
+    
+    workers_per_device = max(1, jobs // max(1, len(devices)))
+    groups = []
+    for files in devices.values():
+        files.sort()
+        groups.extend(files[i::workers_per_device] for i in range(workers_per_device))
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return all(list(executor.map(shred_group, groups)))
+
 def parse_size(size_str):
     """Parse size string with optional suffix (K, M, G)."""
     suffixes = {
@@ -195,6 +411,8 @@ SIZE may be (or may be an integer optionally followed by) one of following:
                         help='change permissions to allow writing if necessary')
     parser.add_argument('-n', '--iterations', type=int, default=3,
                         help='overwrite N times instead of the default (3)')
+    parser.add_argument('--random-source', metavar='FILE',
+                        help='get random bytes from FILE')
     parser.add_argument('-s', '--size', metavar='SIZE',
                         help='shred this many bytes (suffixes K, M, G accepted)')
     parser.add_argument('-u', '--remove', action='store_true',
@@ -205,6 +423,14 @@ SIZE may be (or may be an integer optionally followed by) one of following:
                         help='do not round file sizes up to full blocks')
     parser.add_argument('-z', '--zero', action='store_true',
                         help='add a final overwrite with zeros to hide shredding')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='shred the files inside directories, recursively')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='shred up to N files concurrently')
+    parser.add_argument('--direct', action='store_true',
+                        help='use direct I/O (O_DIRECT), bypassing the page cache')
+    parser.add_argument('--sync', action='store_true',
+                        help='use synchronized writes (O_SYNC)')
     
     args = parser.parse_args()
     
@@ -212,6 +438,9 @@ SIZE may be (or may be an integer optionally followed by) one of following:
     if args.iterations < 1:
         print("shred: invalid number of passes", file=sys.stderr)
         sys.exit(1)
+    if args.jobs < 1:
+        print("shred: invalid number of jobs", file=sys.stderr)
+        sys.exit(1)
         
     # Parse size if provided
     size = None
@@ -222,21 +451,26 @@ SIZE may be (or may be an integer optionally followed by) one of following:
             sys.exit(1)
     
     # Create shredder instance
-    shredder = FileShredder(
-        passes=args.iterations,
-        zeros=args.zero,
-        remove=args.remove,
-        force=args.force,
-        exact=args.exact,
-        verbose=args.verbose,
-        size=size
-    )
+    try:
+        shredder = FileShredder(
+            passes=args.iterations,
+            zeros=args.zero,
+            remove=args.remove,
+            force=args.force,
+            exact=args.exact,
+            verbose=args.verbose,
+            size=size,
+            random_source=args.random_source,
+            direct=args.direct,
+            sync=args.sync
+        )
+    except OSError as e:
+        print(f"shred: {e}", file=sys.stderr)
+        sys.exit(1)
     
     # Process all files
-    success = True
-    for file_path in args.files:
-        if not shredder.shred_file(file_path):
-            success = False
+    paths = list(expand_paths(args.files, args.recursive))
+    success = shred_files(shredder, paths, args.jobs)
             
     sys.exit(0 if success else 1)
 